@@ -1,16 +1,47 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from sqlmodel import SQLModel
-from backend.src.app.dependencies import db_engine
+from sqlmodel import SQLModel, text
+from backend.src.app.dependencies import db_engine, checkpointer, create_search_graph, \
+    summary_worker, cross_encoder
+from backend.src.app.health_router import router as health_router
 from backend.src.products.router import router as products_router
 from backend.src.shops.router import router as shops_router
 from backend.src.users.router import router as users_router
 from backend.src.authentication.router import router as auth_router
 
 
-def initialize_db():
-    SQLModel.metadata.create_all(db_engine)
+DEDUPLICATE_SHOPS = [
+    "UPDATE product SET shop_id = duplicates.keep_id FROM ("
+    "SELECT id, MIN(id) OVER (PARTITION BY name) AS keep_id FROM shop"
+    ") AS duplicates WHERE product.shop_id = duplicates.id AND duplicates.id <> duplicates.keep_id",
+    "DELETE FROM shop USING ("
+    "SELECT id, MIN(id) OVER (PARTITION BY name) AS keep_id FROM shop"
+    ") AS duplicates WHERE shop.id = duplicates.id AND duplicates.id <> duplicates.keep_id",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_shop_name ON shop (name)"
+]
+
+
+async def initialize_db():
+    async with db_engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.create_all)
+
+        for statement in DEDUPLICATE_SHOPS:
+            await connection.execute(text(statement))
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    await initialize_db()
+    await checkpointer.open()
+    create_search_graph()
+    summary_worker.start()
+    yield
+    await summary_worker.stop()
+    cross_encoder.close()
+    await checkpointer.close()
+    await db_engine.dispose()
 
 
 def handle_value_error(_, error: Exception):
@@ -18,23 +49,23 @@ def handle_value_error(_, error: Exception):
 
 
 def create_app():
-    app = FastAPI()
+    app = FastAPI(lifespan=lifespan)
 
     app.include_router(auth_router)
     app.include_router(products_router)
     app.include_router(shops_router)
     app.include_router(users_router)
+    app.include_router(health_router)
 
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["http://localhost:5173"],
         allow_credentials=True,
         allow_headers=["Authorization"],
-        allow_methods=["GET", "POST", "DELETE"]
+        allow_methods=["GET", "POST", "DELETE"],
+        expose_headers=["X-Next-Cursor"]
     )
 
     app.add_exception_handler(ValueError, handle_value_error)
 
-    app.add_event_handler("startup", initialize_db)
-
     return app
@@ -0,0 +1,51 @@
+from psycopg_pool import AsyncConnectionPool
+from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+
+
+class Checkpointer:
+    def __init__(
+            self,
+            conninfo: str,
+            *,
+            min_size: int = 4,
+            max_size: int = 20,
+            timeout: float = 30
+    ):
+        self._pool = AsyncConnectionPool(
+            conninfo,
+            min_size=min_size,
+            max_size=max_size,
+            timeout=timeout,
+            open=False,
+            check=AsyncConnectionPool.check_connection,
+            kwargs={
+                "autocommit": True,
+                "prepare_threshold": 0
+            }
+        )
+        self._saver: AsyncPostgresSaver | None = None
+
+    @property
+    def saver(self) -> AsyncPostgresSaver:
+        if not self._saver:
+            raise RuntimeError("Checkpointer has not been opened")
+        return self._saver
+
+    async def open(self):
+        await self._pool.open(wait=True)
+        self._saver = AsyncPostgresSaver(self._pool)
+        await self._saver.setup()
+
+    async def close(self):
+        await self._pool.close()
+
+    async def is_healthy(self) -> bool:
+        try:
+            async with self._pool.connection() as connection:
+                await connection.execute("SELECT 1")
+            return True
+        except Exception:
+            return False
+
+    async def stats(self) -> dict:
+        return {"healthy": await self.is_healthy(), **self._pool.get_stats()}
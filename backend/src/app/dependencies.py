@@ -1,75 +1,247 @@
+import logging
 import chromadb
+from functools import cache
 from typing import Annotated
 from fastapi import Depends
-from sqlmodel import Session, create_engine
-from psycopg_pool import ConnectionPool
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
 from langchain.chat_models import init_chat_model
 from langchain.retrievers import ContextualCompressionRetriever
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.vectorstores import VectorStore
 from langchain.retrievers.document_compressors import CrossEncoderReranker
-from langchain_community.cross_encoders import HuggingFaceCrossEncoder
+from langchain_community.cross_encoders import BaseCrossEncoder, HuggingFaceCrossEncoder
 from langchain_openai import OpenAIEmbeddings
-from langchain_chroma import Chroma
-from langgraph.checkpoint.postgres import PostgresSaver
+from backend.src.app.checkpointer import Checkpointer
+from backend.src.common.async_chroma import AsyncChroma
+from backend.src.common.bm25_index import Bm25Index
+from backend.src.common.mmap_vector_store import MemoryMappedVectorStore
+from backend.src.common.batching_cross_encoder import BatchingCrossEncoder
+from backend.src.common.onnx_cross_encoder import OnnxCrossEncoder
+from backend.src.common.cached_embeddings import CachedEmbeddings
 from backend.src.search.service import SearchService
+from backend.src.search.hybrid_retriever import HybridRetriever
+from backend.src.search.dual_read_retriever import DualReadRetriever, DualReadStats
+from backend.src.search.evaluation_cache import QueryEvaluationCache
+from backend.src.search.recommendation_cache import RecommendationCache
+from backend.src.search.candidate_pool import CandidatePool
+from backend.src.search.diversifier import Diversifier
 from backend.src.shops.service import ShopService
 from backend.src.users.service import UserService
+from backend.src.products.models import Product
 from backend.src.products.service import ProductService
+from backend.src.products.summary_worker import ProductSummaryWorker
 from backend.src.search.graphs.search_graph import SearchGraph, build as build_search_graph
 from backend.src.search.graphs.retrieve_graph import RetrieveGraph, build as build_retrieve_graph
 from backend.src.products.graphs.summarize_graph import SummarizeGraph, \
     build as build_summarize_graph
 from backend.src.environment import datasource_url, chroma_host, chroma_port, chroma_collection, \
-    llm_model, llm_provider, search_max_results
-
-db_engine = create_engine(datasource_url())
+    llm_model, llm_provider, search_max_results, checkpoint_pool_min_size, \
+    checkpoint_pool_max_size, checkpoint_pool_timeout, evaluation_cache_size, \
+    evaluation_cache_ttl, evaluation_cache_similarity, recommendation_cache_size, \
+    recommendation_cache_ttl, embedding_cache_size, embedding_cache_path, summary_worker_interval, \
+    summary_worker_enabled, summary_worker_batch_size, relevance_threshold, \
+    relevance_borderline_margin, relevance_grading_chunk_size, relevance_grading_concurrency, \
+    reranker_batch_size, reranker_max_wait_ms, reranker_threads, reranker_backend, \
+    reranker_onnx_dir, search_retriever, \
+    lexical_index_path, vector_store_backend, local_vector_store_dir, embedding_model, \
+    embedding_dimensions, chroma_shadow_collection, chroma_shadow_embedding_dimensions, \
+    recommendation_pool_size, recommendation_pool_cache_size, recommendation_pool_ttl, \
+    diversity_fetch_factor, duplicate_similarity_threshold, mmr_lambda
+
+log = logging.getLogger(__name__)
+
+db_engine = create_async_engine(make_url(datasource_url()).set(drivername="postgresql+psycopg"))
+
+checkpointer = Checkpointer(
+    datasource_url(),
+    min_size=checkpoint_pool_min_size(),
+    max_size=checkpoint_pool_max_size(),
+    timeout=checkpoint_pool_timeout()
+)
 
 llm = init_chat_model(llm_model(), model_provider=llm_provider(), temperature=0)
 
-bi_encoder = OpenAIEmbeddings(model="text-embedding-3-small")
-cross_encoder = HuggingFaceCrossEncoder(model_name="cross-encoder/ms-marco-MiniLM-L6-v2")
-reranker = CrossEncoderReranker(model=cross_encoder, top_n=search_max_results())
 
-chroma = Chroma(
-    client=chromadb.HttpClient(host=chroma_host(), port=chroma_port()),
-    collection_name=chroma_collection(),
-    embedding_function=bi_encoder
+def create_embeddings(dimensions: int | None) -> CachedEmbeddings:
+    model = embedding_model()
+    return CachedEmbeddings(
+        OpenAIEmbeddings(model=model, dimensions=dimensions),
+        model=f"{model}:{dimensions}" if dimensions else model,
+        max_size=embedding_cache_size(),
+        path=embedding_cache_path()
+    )
+
+
+bi_encoder = create_embeddings(embedding_dimensions())
+
+CROSS_ENCODER_MODEL = "cross-encoder/ms-marco-MiniLM-L6-v2"
+
+
+def create_cross_encoder_backend() -> BaseCrossEncoder:
+    if reranker_backend() == "onnx":
+        return OnnxCrossEncoder.from_pretrained(
+            CROSS_ENCODER_MODEL,
+            reranker_onnx_dir(),
+            threads=reranker_threads()
+        )
+
+    return HuggingFaceCrossEncoder(model_name=CROSS_ENCODER_MODEL)
+
+
+cross_encoder = BatchingCrossEncoder(
+    create_cross_encoder_backend(),
+    max_batch_size=reranker_batch_size(),
+    max_wait_ms=reranker_max_wait_ms(),
+    torch_threads=reranker_threads() if reranker_backend() != "onnx" else None
 )
+fetch_k = search_max_results() * diversity_fetch_factor()
+reranker = CrossEncoderReranker(model=cross_encoder, top_n=fetch_k)
+
+
+
+def connect_chroma(collection_name: str, embeddings: CachedEmbeddings) -> AsyncChroma:
+    return AsyncChroma(
+        client=chromadb.HttpClient(host=chroma_host(), port=chroma_port()),
+        collection_name=collection_name,
+        embedding_function=embeddings
+    )
+
+
+@cache
+def create_chroma() -> AsyncChroma:
+    return connect_chroma(chroma_collection(), bi_encoder)
+
+
+def create_vector_store() -> VectorStore:
+    if vector_store_backend() == "local":
+        return MemoryMappedVectorStore(local_vector_store_dir(), bi_encoder)
+
+    return create_chroma()
+
+
+vector_store = create_vector_store()
+
+shadow_vector_store = connect_chroma(
+    chroma_shadow_collection(),
+    create_embeddings(chroma_shadow_embedding_dimensions())
+) if chroma_shadow_collection() else None
+dual_read_stats = DualReadStats()
 
-chroma_retriever = chroma.as_retriever(search_kwargs={"k": search_max_results()})
+lexical_index = Bm25Index(lexical_index_path())
+
+
+def create_retriever(k: int) -> BaseRetriever:
+    vector_retriever = vector_store.as_retriever(search_kwargs={"k": k})
+
+    if shadow_vector_store is not None:
+        vector_retriever = DualReadRetriever(
+            primary=vector_retriever,
+            shadow=shadow_vector_store.as_retriever(search_kwargs={"k": k}),
+            dual_read_stats=dual_read_stats
+        )
+
+    if search_retriever() == "hybrid" and len(lexical_index) == 0:
+        log.warning("Lexical index is empty, falling back to vector retrieval")
+    elif search_retriever() == "hybrid":
+        return HybridRetriever(vector_retriever=vector_retriever, lexical_index=lexical_index, k=k)
+
+    return vector_retriever
+
+
+chroma_retriever = create_retriever(fetch_k)
 rerank_retriever = ContextualCompressionRetriever(
     base_compressor=reranker,
-    base_retriever=chroma.as_retriever(search_kwargs={"k": 20})
+    base_retriever=create_retriever(max(20, fetch_k))
+)
+
+diversifier = Diversifier(
+    bi_encoder,
+    vector_store.aget_embeddings,
+    duplicate_threshold=duplicate_similarity_threshold(),
+    lambda_mult=mmr_lambda()
+)
+
+evaluation_cache = QueryEvaluationCache(
+    bi_encoder if evaluation_cache_similarity() else None,
+    max_size=evaluation_cache_size(),
+    ttl=evaluation_cache_ttl(),
+    similarity_threshold=evaluation_cache_similarity() or 1.0
+)
+
+
+async def catalog_version() -> tuple[int, int, int]:
+    async with AsyncSession(db_engine) as session:
+        count, max_id = (await session.exec(
+            select(func.count(Product.id), func.max(Product.id))
+        )).one()
+
+    return await vector_store.acount(), count, max_id or 0
+
+
+recommendation_cache = RecommendationCache(
+    catalog_version,
+    max_size=recommendation_cache_size(),
+    ttl=recommendation_cache_ttl()
+)
+
+candidate_pool = CandidatePool(
+    create_retriever(recommendation_pool_size()),
+    ContextualCompressionRetriever(
+        base_compressor=CrossEncoderReranker(model=cross_encoder, top_n=recommendation_pool_size()),
+        base_retriever=create_retriever(recommendation_pool_size())
+    ),
+    diversifier,
+    page_size=search_max_results(),
+    max_size=recommendation_pool_cache_size(),
+    ttl=recommendation_pool_ttl()
+) if recommendation_pool_size() > search_max_results() else None
+
+retrieve_graph = build_retrieve_graph(
+    llm,
+    chroma_retriever,
+    rerank_retriever,
+    cross_encoder,
+    relevance_threshold(),
+    relevance_borderline_margin(),
+    relevance_grading_chunk_size(),
+    relevance_grading_concurrency(),
+    diversifier,
+    search_max_results()
+)
+summarize_graph = build_summarize_graph(llm, vector_store)
+
+summary_worker = ProductSummaryWorker(
+    db_engine,
+    summarize_graph,
+    llm_model(),
+    enabled=summary_worker_enabled(),
+    interval=summary_worker_interval(),
+    batch_size=summary_worker_batch_size()
 )
 
 
-def create_search_graph():
-    with ConnectionPool(
-            datasource_url(),
-            max_size=20,
-            kwargs={
-                "autocommit": True,
-                "prepare_threshold": 0
-            }
-    ) as pool:
-        memory = PostgresSaver(pool)
-        memory.setup()
-        yield build_search_graph(llm, memory)
+@cache
+def create_search_graph() -> SearchGraph:
+    return build_search_graph(llm, checkpointer.saver)
 
 
 def create_retrieve_graph():
-    return build_retrieve_graph(llm, chroma_retriever, rerank_retriever)
+    return retrieve_graph
 
 
 def create_summarize_graph():
-    return build_summarize_graph(llm, chroma)
+    return summarize_graph
 
 
-def create_db_session():
-    with Session(db_engine) as session:
+async def create_db_session():
+    async with AsyncSession(db_engine, expire_on_commit=False) as session:
         yield session
 
 
-SessionDep = Annotated[Session, Depends(create_db_session)]
+SessionDep = Annotated[AsyncSession, Depends(create_db_session)]
 
 SearchGraphDep = Annotated[SearchGraph, Depends(create_search_graph)]
 
@@ -90,7 +262,7 @@ def create_product_service(
         shop_service: ShopServiceDep,
         summarize_graph: SummarizeGraphDep
 ):
-    return ProductService(session, shop_service, summarize_graph)
+    return ProductService(session, shop_service, summarize_graph, llm_model())
 
 
 ProductServiceDep = Annotated[ProductService, Depends(create_product_service)]
@@ -109,7 +281,15 @@ def create_search_service(
         product_service: ProductServiceDep,
         user_service: UserServiceDep
 ):
-    return SearchService(product_service, user_service, search_graph, retrieve_graph)
+    return SearchService(
+        product_service,
+        user_service,
+        search_graph,
+        retrieve_graph,
+        evaluation_cache,
+        recommendation_cache,
+        candidate_pool
+    )
 
 
 SearchServiceDep = Annotated[SearchService, Depends(create_search_service)]
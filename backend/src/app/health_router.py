@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+from backend.src.app.dependencies import checkpointer, bi_encoder, cross_encoder, \
+    evaluation_cache, recommendation_cache, dual_read_stats, candidate_pool
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+@router.get("/")
+async def get_health():
+    return {
+        "checkpointer": await checkpointer.stats(),
+        "embedding_cache": bi_encoder.stats(),
+        "reranker": cross_encoder.stats(),
+        "evaluation_cache": evaluation_cache.stats(),
+        "recommendation_cache": recommendation_cache.stats(),
+        "dual_read": dual_read_stats.stats(),
+        "candidate_pool": candidate_pool.stats() if candidate_pool else None
+    }
@@ -7,6 +7,7 @@ from google.oauth2 import id_token
 from google.auth.transport import requests
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.security import OAuth2PasswordBearer
+from fastapi.concurrency import run_in_threadpool
 from backend.src.app.dependencies import UserServiceDep
 from backend.src.authentication.models import TokenData, BearerToken, GoogleLogin
 from backend.src.users.models import User, UserIn
@@ -18,7 +19,10 @@ router = APIRouter(prefix="/auth", tags=["authentication"])
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
 
 
-def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], user_service: UserServiceDep):
+async def get_current_user(
+        token: Annotated[str, Depends(oauth2_scheme)],
+        user_service: UserServiceDep
+):
     exception_details = "Could not validate credentials"
     exception_headers = {"WWW-Authenticate": "Bearer"}
 
@@ -26,7 +30,7 @@ def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], user_service
         payload = jwt.decode(token, secret_key(), algorithms=[algorithm()])
         token_data = TokenData(user_id=payload.get("sub"))
 
-        if user := user_service.find_user_by_id(token_data.user_id):
+        if user := await user_service.find_user_by_id(token_data.user_id):
             return user
 
         raise HTTPException(status_code=401, detail=exception_details, headers=exception_headers)
@@ -47,21 +51,22 @@ def create_access_token(data: dict):
 
 
 @router.post("/token/google")
-def login_with_google(google_login: GoogleLogin, user_service: UserServiceDep) -> BearerToken:
+async def login_with_google(google_login: GoogleLogin, user_service: UserServiceDep) -> BearerToken:
     try:
-        id_info = id_token.verify_oauth2_token(
+        id_info = await run_in_threadpool(
+            id_token.verify_oauth2_token,
             google_login.id_token,
             requests.Request(),
             google_client_id()
         )
 
         sub_id = id_info["sub"]
-        user = user_service.find_user_by_sub_id(sub_id)
+        user = await user_service.find_user_by_sub_id(sub_id)
 
         if not user:
             username = id_info.get("given_name")
             picture_url = id_info.get("picture")
-            user = user_service.create_user(
+            user = await user_service.create_user(
                 UserIn(sub_id=sub_id, username=username, picture_url=picture_url)
             )
 
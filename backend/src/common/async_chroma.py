@@ -0,0 +1,72 @@
+import uuid
+from typing import Any
+from langchain_core.documents import Document
+from langchain_core.runnables.config import run_in_executor
+from langchain_chroma.vectorstores import Chroma, DEFAULT_K
+
+
+class AsyncChroma(Chroma):
+    async def asimilarity_search(
+            self,
+            query: str,
+            k: int = DEFAULT_K,
+            filter: dict[str, str] | None = None,
+            **kwargs: Any
+    ) -> list[Document]:
+        embedding = await self.embeddings.aembed_query(query)
+        return await run_in_executor(
+            None,
+            self.similarity_search_by_vector,
+            embedding,
+            k,
+            filter,
+            **kwargs
+        )
+
+    async def aget(self, *args, **kwargs) -> dict[str, Any]:
+        return await run_in_executor(None, self.get, *args, **kwargs)
+
+    async def aget_by_ref_ids(self, ref_ids: list[int]) -> dict[int, Document]:
+        if not ref_ids:
+            return {}
+
+        result = await self.aget(
+            where={"ref_id": {"$in": list(set(ref_ids))}},
+            include=["documents", "metadatas"]
+        )
+        documents = {}
+
+        for page_content, metadata in zip(result.get("documents"), result.get("metadatas")):
+            documents.setdefault(metadata.get("ref_id"), Document(page_content, metadata=metadata))
+
+        return documents
+
+    async def aget_embeddings(self, ids: list[str]) -> dict[str, list[float]]:
+        if not ids:
+            return {}
+
+        result = await self.aget(ids=list(set(ids)), include=["embeddings"])
+        return {
+            id: [float(value) for value in embedding]
+            for id, embedding in zip(result.get("ids"), result.get("embeddings"))
+        }
+
+    async def aupsert_embeddings(
+            self,
+            documents: list[Document],
+            embeddings: list[list[float]],
+            ids: list[str] | None = None
+    ) -> list[str]:
+        ids = ids or [str(uuid.uuid4()) for _ in documents]
+        await run_in_executor(
+            None,
+            self._collection.upsert,
+            ids=ids,
+            embeddings=embeddings,
+            documents=[document.page_content for document in documents],
+            metadatas=[document.metadata for document in documents]
+        )
+        return ids
+
+    async def acount(self) -> int:
+        return await run_in_executor(None, self._collection.count)
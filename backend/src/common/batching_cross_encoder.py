@@ -0,0 +1,139 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import Future
+from queue import Queue, Empty
+from threading import Thread, Lock
+from langchain_community.cross_encoders import BaseCrossEncoder
+
+log = logging.getLogger(__name__)
+
+ScoreRequest = tuple[list[tuple[str, str]], Future]
+
+
+class BatchingCrossEncoder(BaseCrossEncoder):
+    def __init__(
+            self,
+            cross_encoder: BaseCrossEncoder,
+            *,
+            max_batch_size: int = 64,
+            max_wait_ms: float = 5,
+            torch_threads: int | None = None
+    ):
+        self._cross_encoder = cross_encoder
+        self._max_batch_size = max_batch_size
+        self._max_wait_ms = max_wait_ms
+        self._torch_threads = torch_threads
+        self._queue: Queue[ScoreRequest | None] = Queue()
+        self._worker: Thread | None = None
+        self._lock = Lock()
+        self._queued_pairs = 0
+        self._requests = 0
+        self._batches = 0
+        self._batched_pairs = 0
+        self._largest_batch = 0
+
+    def score(self, text_pairs: list[tuple[str, str]]) -> list[float]:
+        return self.submit(text_pairs).result()
+
+    async def ascore(self, text_pairs: list[tuple[str, str]]) -> list[float]:
+        return await asyncio.wrap_future(self.submit(text_pairs))
+
+    def submit(self, text_pairs: list[tuple[str, str]]) -> Future:
+        future = Future()
+
+        if not text_pairs:
+            future.set_result([])
+            return future
+
+        self._ensure_worker()
+
+        with self._lock:
+            self._queued_pairs += len(text_pairs)
+            self._requests += 1
+
+        self._queue.put((list(text_pairs), future))
+        return future
+
+    def close(self):
+        if self._worker:
+            self._queue.put(None)
+            self._worker.join()
+            self._worker = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "queue_depth": self._queued_pairs,
+                "requests": self._requests,
+                "batches": self._batches,
+                "avg_batch_size": self._batched_pairs / self._batches if self._batches else 0.0,
+                "max_batch_size": self._largest_batch
+            }
+
+    def _ensure_worker(self):
+        with self._lock:
+            if not self._worker or not self._worker.is_alive():
+                self._worker = Thread(target=self._run, name="cross-encoder-batcher", daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        if self._torch_threads:
+            import torch
+            torch.set_num_threads(self._torch_threads)
+
+        while batch := self._next_batch():
+            try:
+                self._score_batch(batch)
+            except Exception as e:
+                log.error("Failed to score batch (len: %s): %s", len(batch), str(e))
+
+    def _next_batch(self) -> list[ScoreRequest] | None:
+        if not (request := self._queue.get()):
+            return None
+
+        batch = [request]
+        batch_size = len(request[0])
+        deadline = time.monotonic() + self._max_wait_ms / 1000
+
+        while batch_size < self._max_batch_size and (timeout := deadline - time.monotonic()) > 0:
+            try:
+                request = self._queue.get(timeout=timeout)
+            except Empty:
+                break
+
+            if not request:
+                self._queue.put(None)
+                break
+
+            batch.append(request)
+            batch_size += len(request[0])
+
+        return batch
+
+    def _score_batch(self, batch: list[ScoreRequest]):
+        with self._lock:
+            self._queued_pairs -= sum(len(text_pairs) for text_pairs, _ in batch)
+
+        batch = [request for request in batch if request[1].set_running_or_notify_cancel()]
+        pairs = [pair for text_pairs, _ in batch for pair in text_pairs]
+
+        if not pairs:
+            return
+
+        with self._lock:
+            self._batches += 1
+            self._batched_pairs += len(pairs)
+            self._largest_batch = max(self._largest_batch, len(pairs))
+
+        try:
+            scores = list(self._cross_encoder.score(pairs))
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        offset = 0
+        for text_pairs, future in batch:
+            future.set_result(scores[offset:offset + len(text_pairs)])
+            offset += len(text_pairs)
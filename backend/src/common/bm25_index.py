@@ -0,0 +1,205 @@
+import os
+import re
+import math
+import json
+import sqlite3
+from collections import Counter
+from contextlib import closing
+from langchain_core.documents import Document
+from backend.src.common.metadata_filter import matches_where
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[./-][a-z0-9]+)*")
+
+STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "for", "from", "has", "have", "i",
+    "in", "is", "it", "its", "me", "my", "of", "on", "or", "so", "that", "the", "this", "to",
+    "was", "we", "were", "what", "which", "with", "you", "your"
+})
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class Bm25Index:
+    def __init__(
+            self,
+            path: str,
+            *,
+            k1: float = 1.5,
+            b: float = 0.75,
+            max_document_frequency: float = 0.5
+    ):
+        self._path = path
+        self._k1 = k1
+        self._b = b
+        self._max_document_frequency = max_document_frequency
+
+        if directory := os.path.dirname(path):
+            os.makedirs(directory, exist_ok=True)
+
+        with closing(sqlite3.connect(self._path)) as connection, connection:
+            connection.executescript(
+                "CREATE TABLE IF NOT EXISTS documents "
+                "(id TEXT PRIMARY KEY, length INTEGER NOT NULL, page_content TEXT NOT NULL, "
+                "metadata TEXT NOT NULL);"
+                "CREATE TABLE IF NOT EXISTS postings "
+                "(term TEXT NOT NULL, document_id TEXT NOT NULL, frequency INTEGER NOT NULL, "
+                "PRIMARY KEY (term, document_id)) WITHOUT ROWID;"
+                "CREATE INDEX IF NOT EXISTS postings_document_id ON postings (document_id);"
+                "CREATE TABLE IF NOT EXISTS stats "
+                "(id INTEGER PRIMARY KEY CHECK (id = 0), documents INTEGER, total_length INTEGER);"
+                "INSERT OR IGNORE INTO stats VALUES (0, 0, 0);"
+            )
+
+    def add_documents(self, documents: list[Document], ids: list[str]):
+        token_counts = [Counter(tokenize(document.page_content)) for document in documents]
+
+        with closing(sqlite3.connect(self._path)) as connection, connection:
+            self._delete(connection, ids)
+            connection.executemany("INSERT INTO documents VALUES (?, ?, ?, ?)", [
+                (id, sum(counts.values()), document.page_content, json.dumps(document.metadata))
+                for id, document, counts in zip(ids, documents, token_counts)
+            ])
+            connection.executemany("INSERT INTO postings VALUES (?, ?, ?)", [
+                (term, id, frequency)
+                for id, counts in zip(ids, token_counts)
+                for term, frequency in counts.items()
+            ])
+            connection.execute(
+                "UPDATE stats SET documents = documents + ?, total_length = total_length + ?",
+                (len(documents), sum(sum(counts.values()) for counts in token_counts))
+            )
+
+    def delete(self, ids: list[str]):
+        with closing(sqlite3.connect(self._path)) as connection, connection:
+            self._delete(connection, ids)
+
+    def clear(self):
+        with closing(sqlite3.connect(self._path)) as connection, connection:
+            connection.executescript(
+                "DELETE FROM documents; DELETE FROM postings; "
+                "UPDATE stats SET documents = 0, total_length = 0;"
+            )
+
+    def search(
+            self,
+            query: str,
+            k: int = 4,
+            where: dict | None = None
+    ) -> list[tuple[Document, float]]:
+        tokens = set(tokenize(query))
+        terms = list(tokens - STOPWORDS or tokens)
+
+        if not terms:
+            return []
+
+        with closing(sqlite3.connect(self._path)) as connection:
+            n_documents, total_length = connection.execute(
+                "SELECT documents, total_length FROM stats"
+            ).fetchone()
+
+            if not n_documents:
+                return []
+
+            idfs = self._select_terms(connection, terms, n_documents)
+
+            if not idfs:
+                return []
+
+            values = ", ".join("(?, ?)" for _ in idfs)
+            cursor = connection.execute(
+                f"WITH query_terms (term, idf) AS (VALUES {values}) "
+                "SELECT p.document_id, SUM(q.idf * p.frequency * ? / "
+                "(p.frequency + ? * (1 - ? + ? * d.length / ?))) AS score "
+                "FROM query_terms q JOIN postings p ON p.term = q.term "
+                "JOIN documents d ON d.id = p.document_id "
+                "GROUP BY p.document_id ORDER BY score DESC",
+                [
+                    *[value for term_idf in idfs.items() for value in term_idf],
+                    self._k1 + 1,
+                    self._k1,
+                    self._b,
+                    self._b,
+                    total_length / n_documents
+                ]
+            )
+
+            if not where:
+                return self._load(connection, cursor.fetchmany(k))
+
+            results = []
+
+            while len(results) < k and (page := cursor.fetchmany(k * 4)):
+                results.extend(
+                    (d, s) for d, s in self._load(connection, page)
+                    if matches_where(d.metadata, where)
+                )
+
+            return results[:k]
+
+    def __len__(self):
+        with closing(sqlite3.connect(self._path)) as connection:
+            return connection.execute("SELECT documents FROM stats").fetchone()[0]
+
+    def _load(
+            self,
+            connection: sqlite3.Connection,
+            scored_ids: list[tuple[str, float]]
+    ) -> list[tuple[Document, float]]:
+        if not scored_ids:
+            return []
+
+        rows = connection.execute(
+            "SELECT id, page_content, metadata FROM documents "
+            f"WHERE id IN ({', '.join('?' * len(scored_ids))})",
+            [id for id, _ in scored_ids]
+        ).fetchall()
+        documents = {
+            id: Document(page_content, id=id, metadata=json.loads(metadata))
+            for id, page_content, metadata in rows
+        }
+
+        return [(documents[id], score) for id, score in scored_ids]
+
+    def _select_terms(
+            self,
+            connection: sqlite3.Connection,
+            terms: list[str],
+            n_documents: int
+    ) -> dict[str, float]:
+        document_frequencies = dict(connection.execute(
+            "SELECT term, COUNT(*) FROM postings "
+            f"WHERE term IN ({', '.join('?' * len(terms))}) GROUP BY term",
+            terms
+        ).fetchall())
+        selective = {
+            term: df for term, df in document_frequencies.items()
+            if df / n_documents <= self._max_document_frequency
+        }
+
+        if not selective and document_frequencies:
+            rarest = min(document_frequencies, key=document_frequencies.get)
+            selective = {rarest: document_frequencies[rarest]}
+
+        return {
+            term: math.log(1 + (n_documents - df + 0.5) / (df + 0.5))
+            for term, df in selective.items()
+        }
+
+    def _delete(self, connection: sqlite3.Connection, ids: list[str]):
+        if not ids:
+            return
+
+        placeholders = ", ".join("?" * len(ids))
+        removed = connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(length), 0) FROM documents "
+            f"WHERE id IN ({placeholders})",
+            ids
+        ).fetchone()
+        connection.execute(f"DELETE FROM documents WHERE id IN ({placeholders})", ids)
+        connection.execute(f"DELETE FROM postings WHERE document_id IN ({placeholders})", ids)
+        connection.execute(
+            "UPDATE stats SET documents = documents - ?, total_length = total_length - ?",
+            removed
+        )
@@ -0,0 +1,115 @@
+import os
+import hashlib
+import sqlite3
+import numpy as np
+from contextlib import closing
+from langchain_core.embeddings import Embeddings
+from langchain_core.runnables.config import run_in_executor
+from backend.src.common.lru_cache import LruCache
+
+
+class CachedEmbeddings(Embeddings):
+    def __init__(
+            self,
+            embeddings: Embeddings,
+            *,
+            model: str,
+            max_size: int = 10000,
+            path: str | None = None
+    ):
+        self._embeddings = embeddings
+        self._model = model
+        self._memory = LruCache[str, list[float]](max_size=max_size)
+        self._path = path
+        self._disk_hits = 0
+
+        if self._path:
+            if directory := os.path.dirname(self._path):
+                os.makedirs(directory, exist_ok=True)
+
+            with closing(sqlite3.connect(self._path)) as connection, connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS embeddings "
+                    "(key TEXT PRIMARY KEY, model TEXT NOT NULL, vector BLOB NOT NULL)"
+                )
+
+    def embed_query(self, text: str) -> list[float]:
+        key = self._key(text)
+
+        if (embedding := self._lookup(key)) is not None:
+            return embedding
+
+        return self._store(key, self._embeddings.embed_query(text))
+
+    async def aembed_query(self, text: str) -> list[float]:
+        key = self._key(text)
+
+        if (embedding := self._memory.get(key)) is not None:
+            return embedding
+
+        if (embedding := await run_in_executor(None, self._lookup_disk, key)) is not None:
+            return embedding
+
+        embedding = await self._embeddings.aembed_query(text)
+        return await run_in_executor(None, self._store, key, embedding)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self._embeddings.embed_documents(texts)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        return await self._embeddings.aembed_documents(texts)
+
+    def stats(self) -> dict:
+        stats = self._memory.stats()
+        hits = stats["hits"] + self._disk_hits
+        lookups = stats["hits"] + stats["misses"]
+        return {
+            "size": stats["size"],
+            "memory_hits": stats["hits"],
+            "disk_hits": self._disk_hits,
+            "misses": stats["misses"] - self._disk_hits,
+            "hit_rate": hits / lookups if lookups else 0.0
+        }
+
+    def _lookup(self, key: str) -> list[float] | None:
+        if (embedding := self._memory.get(key)) is not None:
+            return embedding
+
+        return self._lookup_disk(key)
+
+    def _lookup_disk(self, key: str) -> list[float] | None:
+        if not self._path:
+            return None
+
+        with closing(sqlite3.connect(self._path)) as connection:
+            row = connection.execute(
+                "SELECT vector FROM embeddings WHERE key = ?", (key,)
+            ).fetchone()
+
+        if not row:
+            return None
+
+        embedding = np.frombuffer(row[0], dtype=np.float32).tolist()
+        self._memory.put(key, embedding)
+        self._disk_hits += 1
+        return embedding
+
+    def _store(self, key: str, embedding: list[float]) -> list[float]:
+        vector = np.asarray(embedding, dtype=np.float32)
+        embedding = vector.tolist()
+        self._memory.put(key, embedding)
+
+        if self._path:
+            if directory := os.path.dirname(self._path):
+                os.makedirs(directory, exist_ok=True)
+
+            with closing(sqlite3.connect(self._path)) as connection, connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO embeddings (key, model, vector) VALUES (?, ?, ?)",
+                    (key, self._model, vector.tobytes())
+                )
+
+        return embedding
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self._model}\0{text}".encode()).hexdigest()
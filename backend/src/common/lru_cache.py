@@ -0,0 +1,68 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Generic, TypeVar, Hashable
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LruCache(Generic[K, V]):
+    def __init__(self, *, max_size: int = 1000, ttl: float | None = None):
+        self._max_size = max_size
+        self._ttl = ttl
+        self._entries: OrderedDict[K, tuple[V, float]] = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if not entry or self._is_expired(entry):
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: K, value: V):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def touch(self, key: K):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+
+    def items(self) -> list[tuple[K, V]]:
+        with self._lock:
+            return [(key, entry[0]) for key, entry in self._entries.items() if
+                    not self._is_expired(entry)]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+    def _is_expired(self, entry: tuple[V, float]) -> bool:
+        return self._ttl is not None and time.monotonic() - entry[1] >= self._ttl
+
+    def __len__(self):
+        return len(self._entries)
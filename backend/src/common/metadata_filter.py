@@ -0,0 +1,27 @@
+WHERE_OPERATORS = {
+    "$eq": lambda value, operand: value == operand,
+    "$ne": lambda value, operand: value != operand,
+    "$gt": lambda value, operand: value is not None and value > operand,
+    "$gte": lambda value, operand: value is not None and value >= operand,
+    "$lt": lambda value, operand: value is not None and value < operand,
+    "$lte": lambda value, operand: value is not None and value <= operand,
+    "$in": lambda value, operand: value in operand,
+    "$nin": lambda value, operand: value not in operand
+}
+
+
+def matches_where(metadata: dict, where: dict) -> bool:
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_where(metadata, c) for c in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_where(metadata, c) for c in condition):
+                return False
+        else:
+            conditions = condition if isinstance(condition, dict) else {"$eq": condition}
+            value = metadata.get(key)
+            if not all(WHERE_OPERATORS[op](value, operand) for op, operand in conditions.items()):
+                return False
+
+    return True
@@ -0,0 +1,344 @@
+import os
+import json
+import uuid
+import shutil
+import numpy as np
+from typing import Any, Callable, Iterable
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+from langchain_core.runnables.config import run_in_executor
+from backend.src.common.metadata_filter import WHERE_OPERATORS
+
+QUANTIZATIONS = ("float32", "int8", "binary")
+CHUNK_SIZE = 65536
+
+POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1)
+
+COLUMN_OPERATORS = {
+    "$eq": lambda column, operand: column == operand,
+    "$ne": lambda column, operand: column != operand,
+    "$gt": lambda column, operand: column > operand,
+    "$gte": lambda column, operand: column >= operand,
+    "$lt": lambda column, operand: column < operand,
+    "$lte": lambda column, operand: column <= operand,
+    "$in": lambda column, operand: np.isin(column, operand),
+    "$nin": lambda column, operand: ~np.isin(column, operand)
+}
+
+
+class MemoryMappedVectorStore(VectorStore):
+    def __init__(self, directory: str, embedding: Embeddings):
+        self._directory = directory
+        self._embedding = embedding
+
+        with open(os.path.join(directory, "manifest.json"), encoding="utf-8") as file:
+            manifest = json.load(file)
+
+        with open(os.path.join(directory, "documents.json"), encoding="utf-8") as file:
+            documents = json.load(file)
+
+        self._quantization = manifest["quantization"]
+        self._dimensions = manifest["dimensions"]
+        self._vectors = np.load(os.path.join(directory, "vectors.npy"), mmap_mode="r")
+        self._scales = np.load(
+            os.path.join(directory, "scales.npy"),
+            mmap_mode="r"
+        ) if self._quantization == "int8" else None
+
+        self._ids: list[str] = documents["ids"]
+        self._texts: list[str] = documents["documents"]
+        self._metadatas: list[dict] = documents["metadatas"]
+        self._positions = {id: position for position, id in enumerate(self._ids)}
+        self._columns = self._build_columns(self._metadatas)
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    @classmethod
+    def from_texts(
+            cls,
+            texts: list[str],
+            embedding: Embeddings,
+            metadatas: list[dict] | None = None,
+            *,
+            ids: list[str] | None = None,
+            directory: str,
+            quantization: str = "float32",
+            **kwargs: Any
+    ) -> "MemoryMappedVectorStore":
+        write_vector_store(
+            directory,
+            ids or [str(uuid.uuid4()) for _ in texts],
+            embedding.embed_documents(texts),
+            texts,
+            metadatas or [{} for _ in texts],
+            quantization=quantization
+        )
+        return cls(directory, embedding)
+
+    def similarity_search(
+            self,
+            query: str,
+            k: int = 4,
+            filter: dict | None = None,
+            **kwargs: Any
+    ) -> list[Document]:
+        return self.similarity_search_by_vector(self._embedding.embed_query(query), k, filter)
+
+    async def asimilarity_search(
+            self,
+            query: str,
+            k: int = 4,
+            filter: dict | None = None,
+            **kwargs: Any
+    ) -> list[Document]:
+        embedding = await self._embedding.aembed_query(query)
+        return await run_in_executor(None, self.similarity_search_by_vector, embedding, k, filter)
+
+    def similarity_search_with_score(
+            self,
+            query: str,
+            k: int = 4,
+            filter: dict | None = None,
+            **kwargs: Any
+    ) -> list[tuple[Document, float]]:
+        return self.similarity_search_with_score_by_vector(
+            self._embedding.embed_query(query),
+            k,
+            filter
+        )
+
+    def similarity_search_by_vector(
+            self,
+            embedding: list[float],
+            k: int = 4,
+            filter: dict | None = None,
+            **kwargs: Any
+    ) -> list[Document]:
+        return [
+            document
+            for document, _ in self.similarity_search_with_score_by_vector(embedding, k, filter)
+        ]
+
+    def similarity_search_with_score_by_vector(
+            self,
+            embedding: list[float],
+            k: int = 4,
+            filter: dict | None = None
+    ) -> list[tuple[Document, float]]:
+        query = np.asarray(embedding, dtype=np.float32)
+        query /= np.linalg.norm(query) or 1.0
+        candidates = np.flatnonzero(self._mask(filter)) if filter else None
+        positions, scores = self._top_k_positions(query, k, candidates)
+
+        return [
+            (self._document(position), score)
+            for position, score in zip(positions.tolist(), scores.tolist())
+        ]
+
+    def get_by_ids(self, ids: Iterable[str], /) -> list[Document]:
+        return [self._document(self._positions[id]) for id in ids if id in self._positions]
+
+    async def aget_by_ref_ids(self, ref_ids: list[int]) -> dict[int, Document]:
+        if not ref_ids:
+            return {}
+
+        documents = {}
+
+        for position in np.flatnonzero(self._mask({"ref_id": {"$in": list(set(ref_ids))}})):
+            document = self._document(int(position))
+            documents.setdefault(document.metadata.get("ref_id"), document)
+
+        return documents
+
+    async def aget_embeddings(self, ids: list[str]) -> dict[str, list[float]]:
+        return {
+            id: self._vector(self._positions[id]).tolist()
+            for id in ids if id in self._positions
+        }
+
+    def count(self) -> int:
+        return len(self._ids)
+
+    async def acount(self) -> int:
+        return self.count()
+
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        return lambda score: (score + 1) / 2
+
+    def _top_k_positions(
+            self,
+            query: np.ndarray,
+            k: int,
+            candidates: np.ndarray | None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        total = len(self._ids) if candidates is None else len(candidates)
+        packed_query = np.packbits(query > 0) if self._quantization == "binary" else None
+        best_positions, best_scores = [], []
+
+        for start in range(0, total, CHUNK_SIZE):
+            end = min(start + CHUNK_SIZE, total)
+            rows = slice(start, end) if candidates is None else candidates[start:end]
+            scores = self._score_rows(rows, query, packed_query)
+            top = _top_k(scores, k)
+            positions = np.arange(start, end) if candidates is None else rows
+            best_positions.append(positions[top])
+            best_scores.append(scores[top])
+
+        if not best_positions:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        positions, scores = np.concatenate(best_positions), np.concatenate(best_scores)
+        top = _top_k(scores, k)
+        return positions[top], scores[top]
+
+    def _score_rows(
+            self,
+            rows: slice | np.ndarray,
+            query: np.ndarray,
+            packed_query: np.ndarray | None
+    ) -> np.ndarray:
+        vectors = self._vectors[rows]
+
+        if self._quantization == "int8":
+            return (vectors.astype(np.float32) @ query) * self._scales[rows]
+
+        if self._quantization == "binary":
+            hamming = POPCOUNT[np.bitwise_xor(vectors, packed_query)].sum(axis=1)
+            return 1 - 2 * hamming.astype(np.float32) / self._dimensions
+
+        return vectors @ query
+
+    def _vector(self, position: int) -> np.ndarray:
+        vector = self._vectors[position]
+
+        if self._quantization == "int8":
+            return vector.astype(np.float32) * self._scales[position]
+
+        if self._quantization == "binary":
+            signs = np.unpackbits(vector)[:self._dimensions].astype(np.float32) * 2 - 1
+            return signs / np.sqrt(self._dimensions)
+
+        return np.array(vector)
+
+    def _mask(self, where: dict) -> np.ndarray:
+        mask = np.ones(len(self._ids), dtype=bool)
+
+        for key, condition in where.items():
+            if key == "$and":
+                for sub_condition in condition:
+                    mask &= self._mask(sub_condition)
+            elif key == "$or":
+                mask &= np.logical_or.reduce([self._mask(c) for c in condition])
+            else:
+                conditions = condition if isinstance(condition, dict) else {"$eq": condition}
+                for op, operand in conditions.items():
+                    mask &= self._compare(key, op, operand)
+
+        return mask
+
+    def _compare(self, key: str, op: str, operand: Any) -> np.ndarray:
+        column = self._columns.get(key)
+
+        if column is None:
+            column = np.full(len(self._ids), None, dtype=object)
+
+        if column.dtype != object and _is_numeric(operand):
+            return COLUMN_OPERATORS[op](column, operand)
+
+        return np.fromiter(
+            (WHERE_OPERATORS[op](value, operand) for value in column),
+            dtype=bool,
+            count=len(column)
+        )
+
+    def _document(self, position: int) -> Document:
+        return Document(
+            self._texts[position],
+            id=self._ids[position],
+            metadata=dict(self._metadatas[position])
+        )
+
+    def _build_columns(self, metadatas: list[dict]) -> dict[str, np.ndarray]:
+        keys = {key for metadata in metadatas for key in metadata}
+        columns = {}
+
+        for key in keys:
+            values = [metadata.get(key) for metadata in metadatas]
+
+            if all(value is None or _is_numeric(value) for value in values):
+                columns[key] = np.array(
+                    [np.nan if value is None else value for value in values],
+                    dtype=np.float64
+                )
+            else:
+                columns[key] = np.array(values, dtype=object)
+
+        return columns
+
+
+def write_vector_store(
+        directory: str,
+        ids: list[str],
+        embeddings: list[list[float]] | np.ndarray,
+        documents: list[str],
+        metadatas: list[dict],
+        *,
+        quantization: str = "float32"
+):
+    if quantization not in QUANTIZATIONS:
+        raise ValueError(f"Unknown quantization '{quantization}', expected one of {QUANTIZATIONS}")
+
+    if not ids:
+        raise ValueError("Cannot write an empty vector store")
+
+    vectors = np.asarray(embeddings, dtype=np.float32).reshape(len(ids), -1)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = vectors / np.where(norms == 0, 1.0, norms)
+    dimensions = vectors.shape[1]
+
+    staging = f"{directory}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    if quantization == "int8":
+        scales = np.abs(vectors).max(axis=1) / 127
+        scales[scales == 0] = 1.0
+        np.save(os.path.join(staging, "scales.npy"), scales.astype(np.float32))
+        vectors = np.round(vectors / scales[:, None]).astype(np.int8)
+    elif quantization == "binary":
+        vectors = np.packbits(vectors > 0, axis=1)
+
+    np.save(os.path.join(staging, "vectors.npy"), vectors)
+
+    with open(os.path.join(staging, "documents.json"), "w", encoding="utf-8") as file:
+        json.dump({"ids": ids, "documents": documents, "metadatas": metadatas}, file)
+
+    with open(os.path.join(staging, "manifest.json"), "w", encoding="utf-8") as file:
+        json.dump({"quantization": quantization, "dimensions": dimensions, "count": len(ids)}, file)
+
+    previous = f"{directory}.old"
+    shutil.rmtree(previous, ignore_errors=True)
+
+    if os.path.exists(directory):
+        os.replace(directory, previous)
+
+    os.replace(staging, directory)
+    shutil.rmtree(previous, ignore_errors=True)
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    if len(scores) > k:
+        top = np.argpartition(-scores, k - 1)[:k]
+        return top[np.argsort(-scores[top])]
+
+    return np.argsort(-scores)
+
+
+def _is_numeric(value: Any) -> bool:
+    if isinstance(value, (list, tuple)):
+        return all(_is_numeric(v) for v in value)
+
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
@@ -0,0 +1,110 @@
+import os
+import json
+import numpy as np
+import onnxruntime
+from tokenizers import Tokenizer
+from langchain_community.cross_encoders import BaseCrossEncoder
+
+QUANTIZED_MODEL_FILE = "model_int8.onnx"
+
+
+class OnnxCrossEncoder(BaseCrossEncoder):
+    def __init__(self, model_dir: str, *, max_length: int = 512, threads: int | None = None):
+        options = onnxruntime.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+
+        self._session = onnxruntime.InferenceSession(
+            os.path.join(model_dir, QUANTIZED_MODEL_FILE),
+            options,
+            providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {model_input.name for model_input in self._session.get_inputs()}
+        self._tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self._tokenizer.enable_truncation(max_length)
+        if not self._tokenizer.padding:
+            self._tokenizer.enable_padding()
+
+        with open(os.path.join(model_dir, "config.json"), encoding="utf-8") as file:
+            self._sigmoid = self._uses_sigmoid(json.load(file))
+
+    @classmethod
+    def from_pretrained(
+            cls,
+            model_name: str,
+            model_dir: str,
+            **kwargs
+    ) -> "OnnxCrossEncoder":
+        if not os.path.exists(os.path.join(model_dir, QUANTIZED_MODEL_FILE)):
+            export_quantized_model(model_name, model_dir)
+
+        return cls(model_dir, **kwargs)
+
+    def score(self, text_pairs: list[tuple[str, str]]) -> list[float]:
+        if not text_pairs:
+            return []
+
+        encodings = self._tokenizer.encode_batch(text_pairs)
+        inputs = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64)
+        }
+
+        [logits] = self._session.run(
+            None,
+            {name: value for name, value in inputs.items() if name in self._input_names}
+        )
+        scores = logits[:, 1] if logits.shape[1] > 1 else logits[:, 0]
+
+        if self._sigmoid:
+            scores = 1 / (1 + np.exp(-scores))
+
+        return scores.tolist()
+
+    def _uses_sigmoid(self, config: dict) -> bool:
+        activation = config.get("sentence_transformers", {}).get("activation_fn") or config.get(
+            "sbert_ce_default_activation_function"
+        )
+
+        if activation:
+            return activation.endswith("Sigmoid")
+
+        return config.get("num_labels", len(config.get("id2label", {0: ""}))) == 1
+
+
+def export_quantized_model(model_name: str, model_dir: str):
+    import torch
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    os.makedirs(model_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+    tokenizer.save_pretrained(model_dir)
+    model.config.save_pretrained(model_dir)
+
+    input_names = ["input_ids", "attention_mask", "token_type_ids"]
+    sample = tokenizer([("query", "document")], return_tensors="pt")
+    fp32_path = os.path.join(model_dir, "model.onnx")
+
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes={
+                **{name: {0: "batch", 1: "sequence"} for name in input_names},
+                "logits": {0: "batch"}
+            },
+            opset_version=17,
+            dynamo=False
+        )
+
+    quantize_dynamic(
+        fp32_path,
+        os.path.join(model_dir, QUANTIZED_MODEL_FILE),
+        weight_type=QuantType.QInt8
+    )
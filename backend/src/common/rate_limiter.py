@@ -0,0 +1,55 @@
+import time
+import asyncio
+
+
+class TokenBucket:
+    def __init__(self, capacity: float, *, per_seconds: float = 60):
+        self._capacity = capacity
+        self._refill_rate = capacity / per_seconds
+        self._available = capacity
+        self._updated_at = time.monotonic()
+
+    @property
+    def capacity(self) -> float:
+        return self._capacity
+
+    def wait_time(self, amount: float) -> float:
+        self._refill()
+        return max(0.0, (amount - self._available) / self._refill_rate)
+
+    def take(self, amount: float):
+        self._refill()
+        self._available -= amount
+
+    def _refill(self):
+        now = time.monotonic()
+        self._available = min(
+            self._capacity,
+            self._available + (now - self._updated_at) * self._refill_rate
+        )
+        self._updated_at = now
+
+
+class RateLimiter:
+    def __init__(self, *, tokens_per_minute: int, requests_per_minute: int):
+        self._tokens = TokenBucket(tokens_per_minute)
+        self._requests = TokenBucket(requests_per_minute)
+        self._lock = asyncio.Lock()
+        self._waited = 0.0
+
+    async def acquire(self, tokens: int):
+        if tokens > self._tokens.capacity:
+            raise ValueError(
+                f"Request of {tokens} tokens exceeds limit of {self._tokens.capacity} per minute"
+            )
+
+        async with self._lock:
+            while (delay := max(self._tokens.wait_time(tokens), self._requests.wait_time(1))) > 0:
+                self._waited += delay
+                await asyncio.sleep(delay)
+
+            self._tokens.take(tokens)
+            self._requests.take(1)
+
+    def stats(self) -> dict:
+        return {"waited_seconds": round(self._waited, 1)}
@@ -0,0 +1,23 @@
+import json
+from typing import Any, AsyncIterable
+from pydantic import BaseModel
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+
+
+class ServerSentEvent(BaseModel):
+    event: str
+    data: Any = None
+
+    def encode(self) -> str:
+        return f"event: {self.event}\ndata: {json.dumps(jsonable_encoder(self.data))}\n\n"
+
+
+class EventSourceResponse(StreamingResponse):
+    def __init__(self, events: AsyncIterable[ServerSentEvent], **kwargs):
+        super().__init__(
+            (event.encode() async for event in events),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            **kwargs
+        )
@@ -0,0 +1,59 @@
+import asyncio
+import logging
+from langchain_core.runnables.config import run_in_executor
+from sqlmodel.ext.asyncio.session import AsyncSession
+from backend.src.environment import llm_model
+from backend.src.data_import.stopwatch import Stopwatch
+from backend.src.products.service import ProductService
+from backend.src.shops.service import ShopService
+from backend.src.app.dependencies import db_engine, create_chroma, create_summarize_graph
+
+logging.basicConfig(format="%(asctime)s [%(name)s] %(levelname)s: %(message)s", level=logging.INFO)
+log = logging.getLogger(__name__)
+
+chroma = create_chroma()
+
+PAGE_SIZE = 1000
+
+
+async def main():
+    watch = Stopwatch(units="s")
+    total = await chroma.acount()
+    log.info("Backfilling price and shop metadata of %s vector store documents", total)
+
+    async with AsyncSession(db_engine, expire_on_commit=False) as session:
+        product_service = ProductService(
+            session,
+            ShopService(session),
+            create_summarize_graph(),
+            llm_model()
+        )
+
+        for offset in range(0, total, PAGE_SIZE):
+            result = await chroma.aget(include=["metadatas"], limit=PAGE_SIZE, offset=offset)
+            products = await product_service.find_by_ids_ordered(
+                [metadata.get("ref_id") for metadata in result["metadatas"]]
+            )
+            ids, metadatas = [], []
+
+            for id, metadata in zip(result["ids"], result["metadatas"]):
+                if not (product := products.get(metadata.get("ref_id"))):
+                    continue
+
+                ids.append(id)
+                metadatas.append({
+                    **metadata,
+                    "price": product.price,
+                    "shop": product.shop.name.strip().lower()
+                })
+
+            if ids:
+                await run_in_executor(None, chroma._collection.update, ids=ids, metadatas=metadatas)
+
+            log.info("Backfilled %s/%s documents", offset + len(result["ids"]), total)
+
+    log.info("Backfill took %ss, rebuild the lexical index to pick up the metadata", watch.stop())
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
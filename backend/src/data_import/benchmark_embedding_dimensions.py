@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import time
+import numpy as np
+from backend.src.environment import product_catalogues, search_max_results
+from backend.src.data_import.benchmark_reranker import load_queries
+from backend.src.app.dependencies import create_chroma, create_embeddings
+
+logging.basicConfig(format="%(asctime)s [%(name)s] %(levelname)s: %(message)s", level=logging.INFO)
+log = logging.getLogger(__name__)
+
+chroma = create_chroma()
+
+DIMENSIONS = (1024, 768, 512, 256)
+
+
+def truncate(vectors: np.ndarray, dimensions: int) -> np.ndarray:
+    truncated = vectors[:, :dimensions]
+    norms = np.linalg.norm(truncated, axis=1, keepdims=True)
+    return truncated / np.where(norms == 0, 1.0, norms)
+
+
+def search(
+        documents: np.ndarray,
+        queries: np.ndarray,
+        *,
+        k: int,
+        repeats: int
+) -> tuple[np.ndarray, float]:
+    timings = []
+
+    for _ in range(repeats):
+        start = time.perf_counter()
+        scores = queries @ documents.T
+        top = np.argsort(-scores, axis=1)[:, :k]
+        timings.append(time.perf_counter() - start)
+
+    return top, min(timings) * 1000 / len(queries)
+
+
+def recall_at_k(reference: np.ndarray, candidate: np.ndarray) -> float:
+    return float(np.mean([
+        len(set(expected) & set(actual)) / len(expected)
+        for expected, actual in zip(reference, candidate)
+    ]))
+
+
+async def benchmark(
+        data_file: str,
+        *,
+        n_queries: int = 100,
+        k: int = search_max_results(),
+        repeats: int = 5
+):
+    result = await chroma.aget(where={"source": data_file}, include=["documents", "embeddings"])
+
+    if not result.get("documents"):
+        raise ValueError(f"No documents found for {data_file}")
+
+    documents = np.asarray(result["embeddings"], dtype=np.float32)
+    full_dimensions = documents.shape[1]
+    queries = load_queries(data_file, result["documents"], size=n_queries)
+    query_embeddings = np.asarray(
+        await create_embeddings(full_dimensions).aembed_documents(queries),
+        dtype=np.float32
+    )
+
+    log.info("Searching %s documents with %s queries at k=%s", len(documents), len(queries), k)
+
+    reference, reference_latency = search(
+        truncate(documents, full_dimensions),
+        truncate(query_embeddings, full_dimensions),
+        k=k,
+        repeats=repeats
+    )
+    log.info(
+        "%s dimensions: %.1fMB vectors, %.3fms per query",
+        full_dimensions,
+        documents[:, :full_dimensions].nbytes / 2 ** 20,
+        reference_latency
+    )
+
+    for dimensions in [d for d in DIMENSIONS if d < full_dimensions]:
+        candidate, latency = search(
+            truncate(documents, dimensions),
+            truncate(query_embeddings, dimensions),
+            k=k,
+            repeats=repeats
+        )
+        log.info(
+            "%s dimensions: recall@%s %.3f, %.1fMB vectors (-%.0f%%), %.3fms per query (%.2fx)",
+            dimensions,
+            k,
+            recall_at_k(reference, candidate),
+            documents[:, :dimensions].nbytes / 2 ** 20,
+            100 * (1 - dimensions / full_dimensions),
+            latency,
+            reference_latency / latency
+        )
+
+
+def main():
+    data_file, *rest = product_catalogues()
+    asyncio.run(benchmark(data_file))
+
+
+if __name__ == '__main__':
+    main()
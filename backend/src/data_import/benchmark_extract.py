@@ -0,0 +1,143 @@
+import os
+import gzip
+import json
+import random
+import logging
+import tempfile
+import time
+import tracemalloc
+from typing import Callable
+from backend.src.data_import.extract import AmazonProduct, extract_amazon_data, open_data_file
+
+logging.basicConfig(format="%(asctime)s [%(name)s] %(levelname)s: %(message)s", level=logging.INFO)
+log = logging.getLogger(__name__)
+
+N_PRODUCTS = 100_000
+
+
+def synthetic_product(i: int) -> dict:
+    return {
+        "main_category": "Appliances",
+        "title": f"Synthetic Product {i} - Stainless Steel, {random.randint(1, 20)} Pack",
+        "average_rating": round(random.uniform(1, 5), 1),
+        "rating_number": random.randint(0, 10_000),
+        "features": [f"Feature {j} of product {i} with some descriptive text" for j in range(5)],
+        "description": [f"Description paragraph {j} of product {i}. " * 4 for j in range(3)],
+        "price": round(random.uniform(1, 500), 2),
+        "images": [
+            {
+                "thumb": f"https://m.media-amazon.com/images/I/{i}-{j}._SS40_.jpg",
+                "large": f"https://m.media-amazon.com/images/I/{i}-{j}.jpg",
+                "hi_res": f"https://m.media-amazon.com/images/I/{i}-{j}._SL1500_.jpg",
+                "variant": "MAIN" if j == 0 else f"PT0{j}"
+            }
+            for j in range(6)
+        ],
+        "videos": [{"title": f"Video {i}", "url": f"https://www.amazon.com/vdp/{i}"}],
+        "store": f"Store {i % 500}",
+        "categories": ["Appliances", "Parts & Accessories"],
+        "details": {f"Detail {j}": f"Value {j} of product {i}" for j in range(10)},
+        "parent_asin": f"B{i:09d}",
+        "bought_together": None
+    }
+
+
+def write_synthetic_catalog(data_file: str, n_products: int):
+    opener = gzip.open if data_file.endswith(".gz") else open
+
+    with opener(data_file, "wt", encoding="utf-8") as file:
+        for i in range(n_products):
+            file.write(json.dumps(synthetic_product(i)) + "\n")
+
+
+def load_eagerly(data_file: str) -> int:
+    with open_data_file(data_file) as file:
+        raw_products = [json.loads(line.strip()) for line in file]
+
+    amazon_products = [AmazonProduct(**raw_product) for raw_product in raw_products]
+    return len([
+        amazon_product.to_product_import()
+        for amazon_product in amazon_products if amazon_product.contains_required_fields()
+    ])
+
+
+def materialize(data_file: str) -> int:
+    return len(list(extract_amazon_data(data_file)))
+
+
+def stream(data_file: str) -> int:
+    return sum(1 for _ in extract_amazon_data(data_file))
+
+
+def measure(extract: Callable[[str], int], data_file: str) -> tuple[int, float, float]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = extract(data_file)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, peak / 2 ** 20, elapsed
+
+
+def benchmark(n_products: int = N_PRODUCTS):
+    with tempfile.TemporaryDirectory() as directory:
+        for name in ("catalog.jsonl", "catalog.jsonl.gz"):
+            data_file = os.path.join(directory, name)
+            write_synthetic_catalog(data_file, n_products)
+            log.info(
+                "%s: %s products, %.1fMB on disk",
+                name,
+                n_products,
+                os.path.getsize(data_file) / 2 ** 20
+            )
+
+            for mode, extract in (
+                    ("streaming", stream),
+                    ("materialized", materialize),
+                    ("eager", load_eagerly)
+            ):
+                count, peak, elapsed = measure(extract, data_file)
+                log.info(
+                    "%s %s: %s products, peak %.1fMB, %.1fs (%.0f products/s)",
+                    name,
+                    mode,
+                    count,
+                    peak,
+                    elapsed,
+                    count / elapsed
+                )
+
+
+def benchmark_workers(n_products: int = N_PRODUCTS):
+    cores = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, cores} - {w for w in (2, 4) if w > cores})
+
+    with tempfile.TemporaryDirectory() as directory:
+        data_file = os.path.join(directory, "catalog.jsonl")
+        write_synthetic_catalog(data_file, n_products)
+        reference = [p.parent_asin for p in extract_amazon_data(data_file)]
+        log.info("Scaling extraction of %s products across %s cores", n_products, cores)
+
+        baseline = None
+        for workers in worker_counts:
+            start = time.perf_counter()
+            order = [p.parent_asin for p in extract_amazon_data(data_file, workers=workers)]
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            log.info(
+                "%s worker(s): %.1fs (%.0f products/s, %.2fx), order matches: %s",
+                workers,
+                elapsed,
+                len(order) / elapsed,
+                baseline / elapsed,
+                order == reference
+            )
+
+
+def main():
+    benchmark()
+    benchmark_workers()
+
+
+if __name__ == '__main__':
+    main()
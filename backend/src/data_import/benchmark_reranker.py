@@ -0,0 +1,122 @@
+import os
+import json
+import random
+import asyncio
+import logging
+import time
+import numpy as np
+from langchain_community.cross_encoders import BaseCrossEncoder, HuggingFaceCrossEncoder
+from backend.src.definitions import DATA_DIR
+from backend.src.environment import product_catalogues, reranker_onnx_dir, reranker_threads, \
+    search_max_results
+from backend.src.common.onnx_cross_encoder import OnnxCrossEncoder
+from backend.src.app.dependencies import create_chroma, CROSS_ENCODER_MODEL
+
+logging.basicConfig(format="%(asctime)s [%(name)s] %(levelname)s: %(message)s", level=logging.INFO)
+log = logging.getLogger(__name__)
+
+chroma = create_chroma()
+
+QUERY_WORDS = 8
+
+
+def load_queries(data_file: str, documents: list[str], *, size: int) -> list[str]:
+    testset_file = os.path.join(DATA_DIR, f"testset_{data_file}")
+
+    if os.path.exists(testset_file):
+        with open(testset_file, encoding="utf-8") as file:
+            return [data["user_input"] for data in json.load(file)][:size]
+
+    log.info("No testset for %s, using description prefixes as queries", data_file)
+    samples = random.sample(documents, min(size, len(documents)))
+    return [" ".join(document.split()[:QUERY_WORDS]) for document in samples]
+
+
+def time_scores(
+        cross_encoder: BaseCrossEncoder,
+        pairs: list[tuple[str, str]],
+        *,
+        repeats: int
+) -> tuple[list[float], float]:
+    timings = []
+
+    for _ in range(repeats):
+        start = time.perf_counter()
+        scores = list(cross_encoder.score(pairs))
+        timings.append(time.perf_counter() - start)
+
+    return scores, min(timings) * 1000
+
+
+def rank_agreement(reference: list[float], candidate: list[float], *, top_n: int) -> dict:
+    reference_top = set(np.argsort(reference)[::-1][:top_n])
+    candidate_top = set(np.argsort(candidate)[::-1][:top_n])
+    reference_ranks = np.argsort(np.argsort(reference))
+    candidate_ranks = np.argsort(np.argsort(candidate))
+    spearman = np.corrcoef(reference_ranks, candidate_ranks)[0, 1] if len(reference) > 1 else 1.0
+
+    return {
+        "top_n_overlap": len(reference_top & candidate_top) / min(top_n, len(reference)),
+        "spearman": float(spearman)
+    }
+
+
+async def benchmark(
+        data_file: str,
+        *,
+        n_queries: int = 50,
+        k: int = 20,
+        top_n: int = search_max_results(),
+        repeats: int = 3
+):
+    result = await chroma.aget(where={"source": data_file}, include=["documents"])
+    documents = result.get("documents")
+
+    if not documents:
+        raise ValueError(f"No documents found for {data_file}")
+
+    queries = load_queries(data_file, documents, size=n_queries)
+    models = {
+        "fp32": HuggingFaceCrossEncoder(model_name=CROSS_ENCODER_MODEL),
+        "int8": OnnxCrossEncoder.from_pretrained(
+            CROSS_ENCODER_MODEL,
+            reranker_onnx_dir(),
+            threads=reranker_threads()
+        )
+    }
+    latencies = {name: [] for name in models}
+    agreements = []
+
+    for model in models.values():
+        model.score([("warm up", "warm up")])
+
+    log.info("Reranking top %s candidates for %s queries", k, len(queries))
+
+    for query in queries:
+        candidates = await chroma.asimilarity_search(query, k=k)
+        pairs = [(query, candidate.page_content) for candidate in candidates]
+        scores = {}
+
+        for name, model in models.items():
+            scores[name], latency = time_scores(model, pairs, repeats=repeats)
+            latencies[name].append(latency)
+
+        agreements.append(rank_agreement(scores["fp32"], scores["int8"], top_n=top_n))
+
+    for name, timings in latencies.items():
+        log.info("%s: median %.1fms, p95 %.1fms per query", name, np.median(timings),
+                 np.percentile(timings, 95))
+
+    log.info("Speedup: %.2fx", np.median(latencies["fp32"]) / np.median(latencies["int8"]))
+    log.info("Top-%s overlap: %.3f, Spearman: %.3f", top_n,
+             np.mean([a["top_n_overlap"] for a in agreements]),
+             np.mean([a["spearman"] for a in agreements]))
+
+
+def main():
+    data_file, *rest = product_catalogues()
+    asyncio.run(benchmark(data_file))
+
+
+if __name__ == '__main__':
+    main()
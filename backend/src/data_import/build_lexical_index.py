@@ -0,0 +1,39 @@
+import asyncio
+import logging
+from langchain_core.documents import Document
+from langchain_core.runnables.config import run_in_executor
+from backend.src.data_import.stopwatch import Stopwatch
+from backend.src.app.dependencies import create_chroma, lexical_index
+
+logging.basicConfig(format="%(asctime)s [%(name)s] %(levelname)s: %(message)s", level=logging.INFO)
+log = logging.getLogger(__name__)
+
+chroma = create_chroma()
+
+PAGE_SIZE = 1000
+
+
+async def main():
+    watch = Stopwatch(units="s")
+    total = await chroma.acount()
+    log.info("Rebuilding lexical index from %s vector store documents", total)
+    lexical_index.clear()
+
+    for offset in range(0, total, PAGE_SIZE):
+        result = await chroma.aget(
+            include=["documents", "metadatas"],
+            limit=PAGE_SIZE,
+            offset=offset
+        )
+        documents = [
+            Document(page_content, metadata=metadata)
+            for page_content, metadata in zip(result["documents"], result["metadatas"])
+        ]
+        await run_in_executor(None, lexical_index.add_documents, documents, result["ids"])
+        log.info("Indexed %s/%s documents", offset + len(documents), total)
+
+    log.info("Rebuild took %ss", watch.stop())
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -1,5 +1,6 @@
 import os
 import json
+import asyncio
 import random
 import logging
 import time
@@ -8,11 +9,14 @@ from pydantic import BaseModel
 from backend.src.definitions import DATA_DIR
 from backend.src.environment import product_catalogues
 from backend.src.data_import.stopwatch import Stopwatch
-from backend.src.app.dependencies import llm, chroma, create_retrieve_graph as build_retrieve_graph
+from backend.src.app.dependencies import llm, create_chroma, \
+    create_retrieve_graph as build_retrieve_graph
 
 logging.basicConfig(format="%(asctime)s [%(name)s] %(levelname)s: %(message)s", level=logging.INFO)
 log = logging.getLogger(__name__)
 
+chroma = create_chroma()
+
 QUERY_PROMPT = (
     """
 Generate an e-commerce product query based on the specified conditions (style) and the 
@@ -127,7 +131,7 @@ def generate_testset(data_file: str, *, size: int, write_to_disk: bool = False)
         raise ValueError(f"No documents found for {data_file}")
 
 
-def run_testset(
+async def run_testset(
         testset: list[DataFrame] = None,
         *,
         data_file: str = None,
@@ -146,7 +150,7 @@ def run_testset(
     watch = Stopwatch(units="s")
 
     for data_frame in testset[:end_index]:
-        result = retrieve_graph.invoke(query=data_frame.user_input)
+        result = await retrieve_graph.ainvoke(query=data_frame.user_input)
 
         if documents := result.summarized_documents:
             data_frame.response = documents[0].page_content
@@ -168,8 +172,8 @@ def main():
     data_file, *rest = product_catalogues()
     testset = generate_testset(data_file, size=7, write_to_disk=True)
     time.sleep(60)  # 60s timeout: 15 RPM Gemini API limit
-    run_testset(testset, record=True)
-    # run_testset(data_file=data_file, limit=7, record=True)
+    asyncio.run(run_testset(testset, record=True))
+    # asyncio.run(run_testset(data_file=data_file, limit=7, record=True))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,53 @@
+import asyncio
+import logging
+import numpy as np
+from langchain_core.runnables.config import run_in_executor
+from backend.src.environment import local_vector_store_dir, local_vector_store_quantization
+from backend.src.common.mmap_vector_store import write_vector_store
+from backend.src.data_import.stopwatch import Stopwatch
+from backend.src.app.dependencies import create_chroma
+
+logging.basicConfig(format="%(asctime)s [%(name)s] %(levelname)s: %(message)s", level=logging.INFO)
+log = logging.getLogger(__name__)
+
+chroma = create_chroma()
+
+PAGE_SIZE = 1000
+
+
+async def main():
+    watch = Stopwatch(units="s")
+    total = await chroma.acount()
+    quantization = local_vector_store_quantization()
+    log.info("Exporting %s vector store documents (%s)", total, quantization)
+
+    ids, embeddings, documents, metadatas = [], [], [], []
+
+    for offset in range(0, total, PAGE_SIZE):
+        result = await chroma.aget(
+            include=["embeddings", "documents", "metadatas"],
+            limit=PAGE_SIZE,
+            offset=offset
+        )
+        ids.extend(result["ids"])
+        embeddings.append(np.asarray(result["embeddings"], dtype=np.float32))
+        documents.extend(result["documents"])
+        metadatas.extend(result["metadatas"])
+        log.info("Fetched %s/%s documents", len(ids), total)
+
+    await run_in_executor(
+        None,
+        write_vector_store,
+        local_vector_store_dir(),
+        ids,
+        np.concatenate(embeddings),
+        documents,
+        metadatas,
+        quantization=quantization
+    )
+
+    log.info("Export to %s took %ss", local_vector_store_dir(), watch.stop())
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
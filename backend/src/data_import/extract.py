@@ -1,23 +1,30 @@
-import json
-from pydantic import BaseModel, HttpUrl
+import os
+import gzip
+import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import IO, Iterator
+from pydantic import BaseModel, HttpUrl, ValidationError
 from .service import ProductImport
 
+log = logging.getLogger(__name__)
+
+GZIP_MAGIC = b"\x1f\x8b"
+SHARD_BYTES = 8 * 2 ** 20
+SHARDS_IN_FLIGHT_PER_WORKER = 2
+
 
 class AmazonProduct(BaseModel):
     category: str | None = None
     title: str | None = None
-    avg_rating: float | None = None
-    n_ratings: int | None = None
     features: list[str] = []
     description: list[str] = []
     price: float | None = None
     images: list[dict] = []
-    videos: list = []
     store: str | None = None
     categories: list[str] = []
-    details: dict = {}
     parent_asin: str | None = None
-    bought_together: list | None = None
 
     def contains_required_fields(self) -> bool:
         required = [self.title, self.parent_asin, self.price, self.description + self.features]
@@ -26,6 +33,9 @@ class AmazonProduct(BaseModel):
     def get_shop(self) -> str:
         return self.store if self.store else "Amazon"
 
+    def get_category(self) -> str | None:
+        return self.category or next(iter(self.categories), None)
+
     def get_description(self) -> str:
         description = [line.lower().strip() for line in self.description if line.strip()]
         features = [line.lower().strip() for line in self.features if line.strip()]
@@ -46,31 +56,107 @@ class AmazonProduct(BaseModel):
             return HttpUrl(url=thumbnail)
         return None
 
+    def to_product_import(self) -> ProductImport:
+        return ProductImport(
+            title=self.title,
+            price=self.price,
+            url=self.get_product_url(),
+            thumbnail_url=self.get_thumbnail_url(),
+            shop=self.get_shop(),
+            category=self.get_category(),
+            parent_asin=self.parent_asin,
+            description=self.get_description()
+        )
+
     def _distinct_ordered_list(self, collection: list) -> list:
         seen = set()
         seen_add = seen.add
         return [entry for entry in collection if not entry in seen or seen_add(entry)]
 
 
-def extract_amazon_data(data_file: str) -> list[ProductImport]:
-    products = []
+def is_compressed(data_file: str) -> bool:
+    with open(data_file, "rb") as file:
+        return file.read(len(GZIP_MAGIC)) == GZIP_MAGIC
+
+
+def open_data_file(data_file: str) -> IO[str]:
+    if is_compressed(data_file):
+        return gzip.open(data_file, "rt", encoding="utf-8")
 
-    with open(data_file, encoding="utf-8") as file:
-        raw_products = [json.loads(line.strip()) for line in file]
+    return open(data_file, encoding="utf-8")
 
-    for raw_product in raw_products:
-        amazon_product = AmazonProduct(**raw_product)
 
-        if not amazon_product.contains_required_fields():
-            continue
+def shard_byte_ranges(data_file: str, shard_size: int = SHARD_BYTES) -> list[tuple[int, int]]:
+    size = os.path.getsize(data_file)
+    boundaries = [0]
 
-        products.append(ProductImport(
-            title=amazon_product.title,
-            price=amazon_product.price,
-            url=amazon_product.get_product_url(),
-            thumbnail_url=amazon_product.get_thumbnail_url(),
-            shop=amazon_product.get_shop(),
-            description=amazon_product.get_description()
-        ))
+    with open(data_file, "rb") as file:
+        while boundaries[-1] + shard_size < size:
+            file.seek(boundaries[-1] + shard_size)
+            file.readline()
+            if (boundary := file.tell()) >= size:
+                break
+            boundaries.append(boundary)
+
+    boundaries.append(size)
+    return list(zip(boundaries, boundaries[1:]))
+
+
+def extract_shard(data_file: str, start: int, end: int) -> list[ProductImport]:
+    products = []
+
+    with open(data_file, "rb") as file:
+        file.seek(start)
+        position = start
+
+        while position < end and (line := file.readline()):
+            if product := parse_line(line, f"byte {position}"):
+                products.append(product)
+            position += len(line)
 
     return products
+
+
+def parse_line(line: str | bytes, location: str) -> ProductImport | None:
+    if not line.strip():
+        return None
+
+    try:
+        amazon_product = AmazonProduct.model_validate_json(line)
+    except ValidationError as e:
+        log.warning("Skipping malformed line at %s: %s", location, e.errors()[0]["msg"])
+        return None
+
+    if not amazon_product.contains_required_fields():
+        return None
+
+    return amazon_product.to_product_import()
+
+
+def extract_amazon_data(data_file: str, *, workers: int = 1) -> Iterator[ProductImport]:
+    if workers > 1 and is_compressed(data_file):
+        log.info("Compressed %s cannot be sharded, extracting sequentially", data_file)
+    elif workers > 1:
+        yield from extract_amazon_data_parallel(data_file, workers=workers)
+        return
+
+    with open_data_file(data_file) as file:
+        for line_number, line in enumerate(file, start=1):
+            if product := parse_line(line, f"line {line_number}"):
+                yield product
+
+
+def extract_amazon_data_parallel(data_file: str, *, workers: int) -> Iterator[ProductImport]:
+    shards = deque(shard_byte_ranges(data_file))
+    pending: deque[Future[list[ProductImport]]] = deque()
+
+    # Spawned workers re-import the __main__ module, keep entry points free of heavy imports
+    with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        while shards or pending:
+            while shards and len(pending) < workers * SHARDS_IN_FLIGHT_PER_WORKER:
+                pending.append(executor.submit(extract_shard, data_file, *shards.popleft()))
+
+            yield from pending.popleft().result()
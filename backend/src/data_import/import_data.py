@@ -1,14 +1,18 @@
 import os
+import asyncio
 import sys
 import logging
 from backend.src.definitions import DATA_DIR
-from backend.src.environment import product_catalogues
+from backend.src.environment import product_catalogues, llm_model, max_tokens_minute, \
+    max_requests_minute, import_batch_tokens, import_embedding_workers, import_queue_size, \
+    import_extract_workers
+from backend.src.common.rate_limiter import RateLimiter
 from backend.src.data_import.extract import extract_amazon_data
 from backend.src.data_import.service import ImportService
 from backend.src.data_import.stopwatch import Stopwatch
 from backend.src.products.service import ProductService
 from backend.src.shops.service import ShopService
-from backend.src.app.dependencies import create_db_session, chroma, create_summarize_graph
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 logging.basicConfig(format="%(asctime)s [%(name)s] %(levelname)s: %(message)s", level=logging.INFO)
 log = logging.getLogger(__name__)
@@ -22,13 +26,36 @@ def always_accept() -> bool:
     return len(sys.argv) == 2 and sys.argv[1] == "--y"
 
 
-def main():
+async def main():
+    # Imported here so spawned extraction workers, which re-import this module, stay lightweight
+    from backend.src.app.dependencies import db_engine, create_chroma, lexical_index, \
+        create_summarize_graph
+
+    chroma = create_chroma()
     watch = Stopwatch(units="s")
 
-    with next(create_db_session()) as session:
+    async with AsyncSession(db_engine, expire_on_commit=False) as session:
         shop_service = ShopService(session)
-        product_service = ProductService(session, shop_service, create_summarize_graph())
-        import_service = ImportService(product_service, shop_service, chroma)
+        product_service = ProductService(
+            session,
+            shop_service,
+            create_summarize_graph(),
+            llm_model()
+        )
+        rate_limiter = RateLimiter(
+            tokens_per_minute=max_tokens_minute(),
+            requests_per_minute=max_requests_minute()
+        )
+        import_service = ImportService(
+            product_service,
+            shop_service,
+            chroma,
+            lexical_index,
+            rate_limiter,
+            embedding_workers=import_embedding_workers(),
+            queue_size=import_queue_size(),
+            batch_token_limit=min(import_batch_tokens(), max_tokens_minute())
+        )
 
         data_files = get_data_files()
 
@@ -38,29 +65,32 @@ def main():
             source = os.path.basename(data_file)
             log.info("Importing %s", source)
 
-            documents = chroma.get(where={"source": source}, include=["metadatas"])
+            documents = await chroma.aget(where={"source": source}, include=["metadatas"])
             if len(documents["ids"]) > 0:
                 log.info("Skipping already imported %s", source)
                 continue
 
             try:
-                extracted_products = extract_amazon_data(data_file)
-                log.info(
-                    "Extracted %s from %s, took %s",
-                    len(extracted_products),
-                    source,
-                    str(watch)
-                )
-
                 if not always_accept():
+                    size = os.path.getsize(data_file) / 2 ** 20
                     answer = watch.isolate(
                         input,
-                        f"Continue importing {len(extracted_products)} products? (Y/N): "
+                        f"Continue importing products from {source} ({size:.1f}MB)? (Y/N): "
                     )
                     if not answer.lower() == "y":
                         continue
 
-                result = import_service.import_products(extracted_products, source=source)
+                extracted_products = extract_amazon_data(
+                    data_file,
+                    workers=import_extract_workers()
+                )
+                result = await import_service.import_products(extracted_products, source=source)
+                log.info(
+                    "Imported %s products from %s, took %s",
+                    result.imported_products,
+                    source,
+                    str(watch)
+                )
                 for failed_batch, exception in result.failed_batches:
                     log.warning(
                         "Failed to import batch (len: %s). Details %s",
@@ -75,4 +105,4 @@ def main():
 
 
 if __name__ == '__main__':
-    main()
+    asyncio.run(main())
@@ -0,0 +1,125 @@
+import asyncio
+import logging
+from typing import Iterator
+from backend.src.environment import chroma_collection, reindex_target_collection, \
+    reindex_embedding_dimensions, reindex_start_offset, max_tokens_minute, max_requests_minute, \
+    import_batch_tokens
+from backend.src.common.rate_limiter import RateLimiter
+from backend.src.data_import.service import MAX_BATCH_DOCUMENTS
+from backend.src.data_import.stopwatch import Stopwatch
+from backend.src.data_import.token_counter import TokenCounter
+from backend.src.app.dependencies import create_chroma, connect_chroma, create_embeddings
+
+logging.basicConfig(format="%(asctime)s [%(name)s] %(levelname)s: %(message)s", level=logging.INFO)
+log = logging.getLogger(__name__)
+
+chroma = create_chroma()
+
+PAGE_SIZE = 500
+
+Pending = tuple[str, str, dict, int]
+
+
+def create_batches(pending: list[Pending], batch_token_limit: int) -> Iterator[list[Pending]]:
+    current_batch: list[Pending] = []
+    tokens_in_batch = 0
+
+    for document in pending:
+        id, _, _, tokens = document
+
+        if tokens > batch_token_limit:
+            log.warning("Skipping '%s', %s tokens exceed batch limit", id, tokens)
+            continue
+
+        if tokens_in_batch + tokens > batch_token_limit or \
+                len(current_batch) == MAX_BATCH_DOCUMENTS:
+            yield current_batch
+            tokens_in_batch = 0
+            current_batch = []
+
+        current_batch.append(document)
+        tokens_in_batch += tokens
+
+    if current_batch:
+        yield current_batch
+
+
+async def main():
+    target_collection = reindex_target_collection()
+
+    if not target_collection or target_collection == chroma_collection():
+        raise ValueError("REINDEX_TARGET_COLLECTION must name a new collection")
+
+    watch = Stopwatch(units="s")
+    dimensions = reindex_embedding_dimensions()
+    target = connect_chroma(target_collection, create_embeddings(dimensions))
+    rate_limiter = RateLimiter(
+        tokens_per_minute=max_tokens_minute(),
+        requests_per_minute=max_requests_minute()
+    )
+    token_counter = TokenCounter()
+    batch_token_limit = min(import_batch_tokens(), max_tokens_minute())
+    start_offset = reindex_start_offset()
+    total = await chroma.acount()
+    log.info(
+        "Re-embedding %s documents from %s into %s (%s dimensions), starting at offset %s",
+        total,
+        chroma_collection(),
+        target_collection,
+        dimensions or "full",
+        start_offset
+    )
+
+    for offset in range(start_offset, total, PAGE_SIZE):
+        result = await chroma.aget(
+            include=["documents", "metadatas"],
+            limit=PAGE_SIZE,
+            offset=offset
+        )
+        existing = set((await target.aget(ids=result["ids"], include=[]))["ids"])
+        pending = [
+            (id, page_content, metadata, tokens)
+            for id, page_content, metadata, tokens in zip(
+                result["ids"],
+                result["documents"],
+                result["metadatas"],
+                token_counter.count_batch(result["documents"])
+            )
+            if id not in existing
+        ]
+
+        for batch in create_batches(pending, batch_token_limit):
+            ids, texts, metadatas, tokens = map(list, zip(*batch))
+            await rate_limiter.acquire(sum(tokens))
+            await target.aadd_texts(texts, metadatas, ids=ids)
+
+        log.info(
+            "Re-embedded %s/%s documents (%s already present), resume with "
+            "REINDEX_START_OFFSET=%s",
+            offset + len(result["ids"]),
+            total,
+            len(existing),
+            offset + len(result["ids"])
+        )
+
+    target_total = await target.acount()
+    if target_total != total:
+        log.warning("Target holds %s documents but source holds %s", target_total, total)
+
+    log.info(
+        "Re-index took %ss, waited %ss for rate limits",
+        watch.stop(),
+        rate_limiter.stats()["waited_seconds"]
+    )
+    log.info(
+        "Shadow-read with CHROMA_SHADOW_COLLECTION=%s CHROMA_SHADOW_EMBEDDING_DIMENSIONS=%s, "
+        "cut over with CHROMA_COLLECTION=%s EMBEDDING_DIMENSIONS=%s once /health overlap holds",
+        target_collection,
+        dimensions or "",
+        target_collection,
+        dimensions or ""
+    )
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
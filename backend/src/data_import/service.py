@@ -1,37 +1,66 @@
 import time
+import asyncio
 import logging
-import tiktoken
+from itertools import islice
+from typing import Coroutine, Iterable, Iterator
 from pydantic import BaseModel
 from langchain_core.documents import Document
-from langchain_core.vectorstores import VectorStore
-from backend.src.environment import max_tokens_minute
-from backend.src.products.models import ProductBase, ProductIn
+from langchain_core.runnables.config import run_in_executor
+from backend.src.common.async_chroma import AsyncChroma
+from backend.src.common.bm25_index import Bm25Index
+from backend.src.common.rate_limiter import RateLimiter
+from backend.src.products.models import ProductBase, ProductIn, Product
 from backend.src.products.service import ProductService
 from backend.src.shops.models import ShopIn
 from backend.src.shops.service import ShopService
 from backend.src.data_import.stopwatch import Stopwatch
+from backend.src.data_import.token_counter import TokenCounter
 
 log = logging.getLogger(__name__)
 
 SECONDS_IN_MINUTE = 60
+MAX_BATCH_DOCUMENTS = 1000
+COUNT_CHUNK_SIZE = 1000
 
 
 class ProductImport(ProductBase):
     description: str
     shop: str
+    category: str | None = None
+    parent_asin: str | None = None
 
 
 class BatchedProduct(BaseModel):
     product: ProductImport
     document: Document
+    tokens: int
+
+
+class ProductBatch(BaseModel):
+    batched_products: list[BatchedProduct]
+    products: list[Product] = []
+    embeddings: list[list[float]] = []
+
+    @property
+    def tokens(self) -> int:
+        return sum(bp.tokens for bp in self.batched_products)
+
+    class Config:
+        arbitrary_types_allowed = True
 
 
 class ImportResult(BaseModel):
     failed_batches: list[tuple[list[BatchedProduct], Exception]] = []
+    imported_products: int = 0
+    imported_tokens: int = 0
 
     def add_failed(self, batched_products: list[BatchedProduct], exception: Exception):
         self.failed_batches.append((batched_products, exception))
 
+    def add_imported(self, batch: ProductBatch):
+        self.imported_products += len(batch.products)
+        self.imported_tokens += batch.tokens
+
     class Config:
         arbitrary_types_allowed = True
 
@@ -41,136 +70,237 @@ class ImportService:
             self,
             product_service: ProductService,
             shop_service: ShopService,
-            vector_store: VectorStore
+            vector_store: AsyncChroma,
+            lexical_index: Bm25Index | None = None,
+            rate_limiter: RateLimiter | None = None,
+            token_counter: TokenCounter | None = None,
+            *,
+            embedding_workers: int = 4,
+            queue_size: int = 8,
+            batch_token_limit: int = 20000
     ):
         self._product_service = product_service
         self._shop_service = shop_service
         self._vector_store = vector_store
-
-    def import_products(self, products: list[ProductImport], *, source: str) -> ImportResult:
+        self._lexical_index = lexical_index
+        self._rate_limiter = rate_limiter
+        self._token_counter = token_counter or TokenCounter()
+        self._embedding_workers = embedding_workers
+        self._queue_size = queue_size
+        self._batch_token_limit = batch_token_limit
+        self._session_lock = asyncio.Lock()
+
+    async def import_products(
+            self,
+            products: Iterable[ProductImport],
+            *,
+            source: str
+    ) -> ImportResult:
         watch = Stopwatch(units="s")
+        started = time.monotonic()
         result = ImportResult()
-        batches = self._create_batches(products, source=source)
-        total_tokens = self._count_total_tokens(
-            [bp.document.page_content for batch in batches for bp in batch]
+        counted: asyncio.Queue[ProductBatch | None] = asyncio.Queue(self._queue_size)
+        stored: asyncio.Queue[ProductBatch | None] = asyncio.Queue(self._queue_size)
+        embedded: asyncio.Queue[ProductBatch | None] = asyncio.Queue(self._queue_size)
+
+        async def count_tokens():
+            batches = self._create_batches(products, source=source)
+
+            while (batch := await run_in_executor(None, next, batches, None)) is not None:
+                await counted.put(batch)
+            await counted.put(None)
+
+        async def store():
+            shop_resolver = self._shop_service.create_resolver()
+
+            while (batch := await counted.get()) is not None:
+                try:
+                    await self._store_batch(batch, shop_resolver)
+                    await stored.put(batch)
+                except Exception as e:
+                    log.error(
+                        "Failed to store batch (len: %s): %s",
+                        len(batch.batched_products),
+                        str(e)
+                    )
+                    result.add_failed(batch.batched_products, e)
+
+            for _ in range(self._embedding_workers):
+                await stored.put(None)
+
+        async def embed():
+            while (batch := await stored.get()) is not None:
+                try:
+                    await self._embed_batch(batch)
+                    await embedded.put(batch)
+                except Exception as e:
+                    await self._rollback(batch, e, result)
+
+            await embedded.put(None)
+
+        async def upsert():
+            running_workers = self._embedding_workers
+
+            while running_workers:
+                if (batch := await embedded.get()) is None:
+                    running_workers -= 1
+                    continue
+
+                try:
+                    await self._upsert_batch(batch)
+                except Exception as e:
+                    await self._rollback(batch, e, result)
+                    continue
+
+                result.add_imported(batch)
+                elapsed = max(time.monotonic() - started, 1)
+                log.info(
+                    "Imported %s products, %s tokens/min",
+                    result.imported_products,
+                    int(result.imported_tokens / elapsed * SECONDS_IN_MINUTE)
+                )
+
+        await self._run_stages(
+            count_tokens(),
+            store(),
+            *[embed() for _ in range(self._embedding_workers)],
+            upsert()
         )
 
         log.info(
-            "Total tokens: %s, Total batches: %s, Estimated time %ss",
-            total_tokens,
-            len(batches),
-            len(batches) * SECONDS_IN_MINUTE
+            "All batches processed, %s products imported, %s batches failed, took %ss",
+            result.imported_products,
+            len(result.failed_batches),
+            watch.stop()
         )
+        return result
 
-        for i, batch in enumerate(batches):
-            try:
-                log.info("Processing %s. batch (len: %s)", i + 1, len(batch))
-                self._import_product_batch(batch)
-            except Exception as e:
-                log.error("Exception caught: %s", str(e))
-                result.add_failed(batch, e)
+    async def _run_stages(self, *stages: Coroutine):
+        tasks = [asyncio.create_task(stage) for stage in stages]
 
-            duration = watch.lap()
-            timeout = max(0, SECONDS_IN_MINUTE - duration)
-            unprocessed_batches = len(batches) - (i + 1)
-            remaining = unprocessed_batches * SECONDS_IN_MINUTE + timeout
-            log.info("Batch processed, took %ss", duration)
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
 
-            if unprocessed_batches:
-                log.info("Next batch in %ss, estimated %ss remaining", timeout, remaining)
-                watch.isolate(time.sleep, timeout)
+    async def _store_batch(self, batch: ProductBatch, shop_resolver: ShopService.Resolver):
+        async with self._session_lock:
+            create_products_batch = self._product_service.create_batch()
+            shop_ids = await shop_resolver.resolve([
+                ShopIn(name=bp.product.shop, url="https://example.com")
+                for bp in batch.batched_products
+            ])
 
-        log.info("All batches processed, took %ss", watch.stop())
-        return result
+            stored_products = []
 
-    def _import_product_batch(self, batch: list[BatchedProduct]):
-        create_shops_batch = self._shop_service.create_batch()
-        create_products_batch = self._product_service.create_batch()
+            for batched_product in batch.batched_products:
+                product = batched_product.product
 
-        for batched_product in batch:
-            product = batched_product.product
-            shop = self._shop_service.find_by_name(product.shop)
+                if (shop_id := shop_ids.get(product.shop)) is None:
+                    log.warning("Shop '%s' not found, skipping", product.shop)
+                    continue
 
-            if not shop and product.shop not in create_shops_batch:
-                create_shops_batch.add(ShopIn(
-                    name=product.shop,
-                    url="https://example.com"
+                create_products_batch.add(ProductIn(
+                    **product.model_dump(),
+                    shop_id=shop_id
                 ))
+                stored_products.append(batched_product)
 
-        shops = create_shops_batch.commit()
+            batch.products = await create_products_batch.commit()
+            batch.batched_products = stored_products
 
-        for batched_product in batch:
-            product = batched_product.product
-            shop = self._shop_service.find_by_name(product.shop)
+        for batched_product, product in zip(batch.batched_products, batch.products):
+            batched_product.document.metadata["ref_id"] = product.id
 
-            if not shop:
-                log.warning("Shop '%s' not found, skipping", product.shop)
-                continue
+    async def _embed_batch(self, batch: ProductBatch):
+        if self._rate_limiter:
+            await self._rate_limiter.acquire(batch.tokens)
 
-            create_products_batch.add(ProductIn(
-                **product.model_dump(),
-                shop_id=shop.id
-            ))
+        batch.embeddings = await self._vector_store.embeddings.aembed_documents(
+            [bp.document.page_content for bp in batch.batched_products]
+        )
 
-        products = create_products_batch.commit()
+    async def _upsert_batch(self, batch: ProductBatch):
+        documents = [bp.document for bp in batch.batched_products]
+        ids = await self._vector_store.aupsert_embeddings(documents, batch.embeddings)
 
-        for product in products:
-            batched_product = next((bp for bp in batch if bp.product.title == product.title), None)
+        if self._lexical_index is not None:
+            try:
+                await run_in_executor(None, self._lexical_index.add_documents, documents, ids)
+            except Exception as e:
+                log.error("Failed to update lexical index, rebuild it later. Details: %s", str(e))
 
-            if not batched_product:
-                log.warning("Product '%s' not found, skipping", product.title)
-                continue
+    async def _rollback(self, batch: ProductBatch, exception: Exception, result: ImportResult):
+        log.error("Failed to store embeddings. Performing rollback... Details: %s", str(exception))
+        result.add_failed(batch.batched_products, exception)
 
-            batched_product.document.metadata["ref_id"] = product.id
-
-        try:
-            documents = [bp.document for bp in batch]
-            self._vector_store.add_documents(documents)
-        except Exception as e:
-            log.error("Failed to store embeddings. Performing rollback... Details: %s", str(e))
-            self._product_service.delete(products)
-            self._shop_service.delete(shops)
-            raise
+        async with self._session_lock:
+            await self._product_service.delete(batch.products)
 
     def _create_batches(
             self,
-            products: list[ProductImport],
+            products: Iterable[ProductImport],
             *,
-            source: str,
-            batch_token_limit: int = max_tokens_minute()
-    ) -> list[list[BatchedProduct]]:
-        batches: list[list[BatchedProduct]] = []
-
+            source: str
+    ) -> Iterator[ProductBatch]:
         current_batch: list[BatchedProduct] = []
         tokens_in_batch = 0
-        i = 0
 
-        while i < len(products):
-            product = products[i]
-            content = f"{product.title} - {product.price}$ - {product.description}"
-            tokens = self._count_tokens(content)
+        for batched_product in self._count_tokens(products, source=source):
+            tokens = batched_product.tokens
 
-            if tokens > batch_token_limit:
-                raise Exception("Document contains more tokens than allowed in batch")
+            if tokens > self._batch_token_limit:
+                log.warning(
+                    "Skipping '%s', %s tokens exceed batch limit",
+                    batched_product.product.title,
+                    tokens
+                )
+                continue
 
-            if tokens_in_batch + tokens > batch_token_limit:
-                batches.append(current_batch)
+            if tokens_in_batch + tokens > self._batch_token_limit or \
+                    len(current_batch) == MAX_BATCH_DOCUMENTS:
+                yield ProductBatch(batched_products=current_batch)
                 tokens_in_batch = 0
                 current_batch = []
-            else:
-                document = Document(page_content=content, metadata={"source": source})
-                current_batch.append(BatchedProduct(product=product, document=document))
-                tokens_in_batch += tokens
-                i += 1
-
-        if current_batch:
-            batches.append(current_batch)
 
-        return batches
+            current_batch.append(batched_product)
+            tokens_in_batch += tokens
 
-    def _count_total_tokens(self, texts: list[str]) -> int:
-        return sum([self._count_tokens(text) for text in texts])
+        if current_batch:
+            yield ProductBatch(batched_products=current_batch)
 
-    def _count_tokens(self, text: str) -> int:
-        encoding = tiktoken.get_encoding("cl100k_base")
-        return len(encoding.encode(text))
+    def _count_tokens(
+            self,
+            products: Iterable[ProductImport],
+            *,
+            source: str
+    ) -> Iterator[BatchedProduct]:
+        products = iter(products)
+
+        while chunk := list(islice(products, COUNT_CHUNK_SIZE)):
+            contents = [f"{p.title} - {p.price}$ - {p.description}" for p in chunk]
+
+            for product, content, tokens in zip(
+                    chunk,
+                    contents,
+                    self._token_counter.count_batch(contents)
+            ):
+                document = Document(
+                    page_content=content,
+                    metadata=self._document_metadata(product, source)
+                )
+                yield BatchedProduct(product=product, document=document, tokens=tokens)
+
+    def _document_metadata(self, product: ProductImport, source: str) -> dict:
+        metadata = {"source": source, "price": product.price, "shop": product.shop.strip().lower()}
+
+        if product.category:
+            metadata["category"] = product.category.strip().lower()
+
+        if product.parent_asin:
+            metadata["parent_asin"] = product.parent_asin
+
+        return metadata
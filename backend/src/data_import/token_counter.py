@@ -0,0 +1,16 @@
+import tiktoken
+
+
+class TokenCounter:
+    def __init__(self, encoding_name: str = "cl100k_base", *, num_threads: int = 8):
+        self._encoding = tiktoken.get_encoding(encoding_name)
+        self._num_threads = num_threads
+
+    def count(self, text: str) -> int:
+        return len(self._encoding.encode_ordinary(text))
+
+    def count_batch(self, texts: list[str]) -> list[int]:
+        return [
+            len(tokens)
+            for tokens in self._encoding.encode_ordinary_batch(texts, num_threads=self._num_threads)
+        ]
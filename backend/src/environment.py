@@ -1,5 +1,6 @@
 import os
 from dotenv import load_dotenv
+from backend.src.definitions import DATA_DIR, MODELS_DIR
 
 load_dotenv()
 
@@ -8,6 +9,18 @@ def datasource_url() -> str:
     return os.getenv("DATASOURCE_URL")
 
 
+def checkpoint_pool_min_size() -> int:
+    return int(os.getenv("CHECKPOINT_POOL_MIN_SIZE", 4))
+
+
+def checkpoint_pool_max_size() -> int:
+    return int(os.getenv("CHECKPOINT_POOL_MAX_SIZE", 20))
+
+
+def checkpoint_pool_timeout() -> float:
+    return float(os.getenv("CHECKPOINT_POOL_TIMEOUT", 30))
+
+
 def chroma_host() -> str:
     return os.getenv("CHROMA_HOST")
 
@@ -24,6 +37,162 @@ def search_max_results() -> int:
     return int(os.getenv("SEARCH_MAX_RESULTS"))
 
 
+def embedding_model() -> str:
+    return os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+
+
+def embedding_dimensions() -> int | None:
+    dimensions = os.getenv("EMBEDDING_DIMENSIONS")
+    return int(dimensions) if dimensions else None
+
+
+def chroma_shadow_collection() -> str | None:
+    return os.getenv("CHROMA_SHADOW_COLLECTION") or None
+
+
+def chroma_shadow_embedding_dimensions() -> int | None:
+    dimensions = os.getenv("CHROMA_SHADOW_EMBEDDING_DIMENSIONS")
+    return int(dimensions) if dimensions else None
+
+
+def reindex_target_collection() -> str | None:
+    return os.getenv("REINDEX_TARGET_COLLECTION") or None
+
+
+def reindex_embedding_dimensions() -> int | None:
+    dimensions = os.getenv("REINDEX_EMBEDDING_DIMENSIONS")
+    return int(dimensions) if dimensions else None
+
+
+def reindex_start_offset() -> int:
+    return int(os.getenv("REINDEX_START_OFFSET", 0))
+
+
+def embedding_cache_size() -> int:
+    return int(os.getenv("EMBEDDING_CACHE_SIZE", 10000))
+
+
+def embedding_cache_path() -> str | None:
+    return os.getenv(
+        "EMBEDDING_CACHE_PATH",
+        os.path.join(DATA_DIR, "embedding_cache.sqlite")
+    ) or None
+
+
+def search_retriever() -> str:
+    return os.getenv("SEARCH_RETRIEVER", "vector")
+
+
+def lexical_index_path() -> str:
+    return os.getenv("LEXICAL_INDEX_PATH", os.path.join(DATA_DIR, "lexical_index.sqlite"))
+
+
+def vector_store_backend() -> str:
+    return os.getenv("VECTOR_STORE_BACKEND", "chroma")
+
+
+def local_vector_store_dir() -> str:
+    return os.getenv("LOCAL_VECTOR_STORE_DIR", os.path.join(DATA_DIR, "vector_store"))
+
+
+def local_vector_store_quantization() -> str:
+    return os.getenv("LOCAL_VECTOR_STORE_QUANTIZATION", "float32")
+
+
+def evaluation_cache_size() -> int:
+    return int(os.getenv("EVALUATION_CACHE_SIZE", 1000))
+
+
+def evaluation_cache_ttl() -> float:
+    return float(os.getenv("EVALUATION_CACHE_TTL_SECONDS", 3600))
+
+
+def evaluation_cache_similarity() -> float | None:
+    threshold = os.getenv("EVALUATION_CACHE_SIMILARITY")
+    return float(threshold) if threshold else None
+
+
+def recommendation_cache_size() -> int:
+    return int(os.getenv("RECOMMENDATION_CACHE_SIZE", 1000))
+
+
+def recommendation_cache_ttl() -> float:
+    return float(os.getenv("RECOMMENDATION_CACHE_TTL_SECONDS", 3600))
+
+
+def recommendation_pool_size() -> int:
+    return int(os.getenv("RECOMMENDATION_POOL_SIZE", 40))
+
+
+def recommendation_pool_cache_size() -> int:
+    return int(os.getenv("RECOMMENDATION_POOL_CACHE_SIZE", 1000))
+
+
+def recommendation_pool_ttl() -> float:
+    return float(os.getenv("RECOMMENDATION_POOL_TTL_SECONDS", 1800))
+
+
+def reranker_batch_size() -> int:
+    return int(os.getenv("RERANKER_BATCH_SIZE", 64))
+
+
+def reranker_max_wait_ms() -> float:
+    return float(os.getenv("RERANKER_MAX_WAIT_MS", 5))
+
+
+def reranker_threads() -> int | None:
+    threads = os.getenv("RERANKER_THREADS")
+    return int(threads) if threads else None
+
+
+def reranker_backend() -> str:
+    return os.getenv("RERANKER_BACKEND", "torch")
+
+
+def reranker_onnx_dir() -> str:
+    return os.getenv("RERANKER_ONNX_DIR", os.path.join(MODELS_DIR, "ms-marco-MiniLM-L6-v2-int8"))
+
+
+def relevance_threshold() -> float:
+    return float(os.getenv("RELEVANCE_THRESHOLD", 0.5))
+
+
+def relevance_borderline_margin() -> float:
+    return float(os.getenv("RELEVANCE_BORDERLINE_MARGIN", 0.3))
+
+
+def relevance_grading_chunk_size() -> int:
+    return int(os.getenv("RELEVANCE_GRADING_CHUNK_SIZE", 5))
+
+
+def relevance_grading_concurrency() -> int:
+    return int(os.getenv("RELEVANCE_GRADING_CONCURRENCY", 4))
+
+
+def diversity_fetch_factor() -> int:
+    return int(os.getenv("DIVERSITY_FETCH_FACTOR", 2))
+
+
+def duplicate_similarity_threshold() -> float:
+    return float(os.getenv("DUPLICATE_SIMILARITY_THRESHOLD", 0.95))
+
+
+def mmr_lambda() -> float:
+    return float(os.getenv("MMR_LAMBDA", 0.7))
+
+
+def summary_worker_enabled() -> bool:
+    return os.getenv("ENABLE_SUMMARY_WORKER", "true").lower() == "true"
+
+
+def summary_worker_interval() -> float:
+    return float(os.getenv("SUMMARY_WORKER_INTERVAL_SECONDS", 300))
+
+
+def summary_worker_batch_size() -> int:
+    return int(os.getenv("SUMMARY_WORKER_BATCH_SIZE", 20))
+
+
 def google_client_id() -> str:
     return os.getenv("AUTH_GOOGLE_CLIENT_ID")
 
@@ -62,3 +231,23 @@ def product_catalogues() -> list[str]:
 
 def max_tokens_minute() -> int:
     return int(os.getenv("IMPORT_MAX_TOKENS_PER_MINUTE"))
+
+
+def max_requests_minute() -> int:
+    return int(os.getenv("IMPORT_MAX_REQUESTS_PER_MINUTE", 3000))
+
+
+def import_batch_tokens() -> int:
+    return int(os.getenv("IMPORT_BATCH_TOKENS", 20000))
+
+
+def import_embedding_workers() -> int:
+    return int(os.getenv("IMPORT_EMBEDDING_WORKERS", 4))
+
+
+def import_queue_size() -> int:
+    return int(os.getenv("IMPORT_QUEUE_SIZE", 8))
+
+
+def import_extract_workers() -> int:
+    return int(os.getenv("IMPORT_EXTRACT_WORKERS", 1))
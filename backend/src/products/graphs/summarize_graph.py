@@ -1,9 +1,10 @@
+from functools import partial
 from langchain_core.documents import Document
 from langchain_core.language_models import BaseChatModel
-from langchain_chroma.vectorstores import Chroma
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.state import CompiledStateGraph
-from langgraph.checkpoint.memory import InMemorySaver
+from backend.src.common.async_chroma import AsyncChroma
+from backend.src.common.mmap_vector_store import MemoryMappedVectorStore
 from backend.src.search.graphs.graph_wrapper import GraphWrapper
 from backend.src.products.graphs.summarize_graph_state import SummarizeGraphState, \
     SummarizedContentList, ProductSummary
@@ -37,15 +38,18 @@ Here are the documents/products:
 )
 
 
-def summarize(llm: BaseChatModel, chroma: Chroma, s: SummarizeGraphState):
-    def invoke(state: SummarizeGraphState):
-        product_documents: list[Document] = []
+async def summarize(
+        llm: BaseChatModel,
+        vector_store: AsyncChroma | MemoryMappedVectorStore,
+        s: SummarizeGraphState
+):
+    async def invoke(state: SummarizeGraphState):
+        documents_by_id = await vector_store.aget_by_ref_ids(state.product_ids)
 
-        for product_id in state.product_ids:
-            chroma_result = chroma.get(where={"ref_id": product_id})
-            [page_content] = chroma_result.get("documents")
-            [metadata] = chroma_result.get("metadatas")
-            product_documents.append(Document(page_content, metadata=metadata))
+        if missing_ids := [id for id in state.product_ids if id not in documents_by_id]:
+            raise ValueError(f"No product descriptions found for ids {missing_ids}")
+
+        product_documents: list[Document] = [documents_by_id[id] for id in state.product_ids]
 
         prompt = SUMMARIZE_PROMPT.format(
             n_words_titles=state.title_length,
@@ -57,7 +61,7 @@ def summarize(llm: BaseChatModel, chroma: Chroma, s: SummarizeGraphState):
         )
 
         # TODO: Increase temperatur for this -> https://python.langchain.com/docs/how_to/configure/
-        summaries = llm.with_structured_output(SummarizedContentList).invoke(prompt)
+        summaries = await llm.with_structured_output(SummarizedContentList).ainvoke(prompt)
 
         return {"summarized_products": [
             ProductSummary(
@@ -67,27 +71,33 @@ def summarize(llm: BaseChatModel, chroma: Chroma, s: SummarizeGraphState):
             ) for summary in summaries.list
         ]}
 
-    return invoke(s)
+    return await invoke(s)
 
 
-def build_graph(llm: BaseChatModel, chroma: Chroma) -> CompiledStateGraph:
+def build_graph(
+        llm: BaseChatModel,
+        vector_store: AsyncChroma | MemoryMappedVectorStore
+) -> CompiledStateGraph:
     graph_builder = StateGraph(SummarizeGraphState)
 
-    graph_builder.add_node("summarize", lambda state: summarize(llm, chroma, state))
+    graph_builder.add_node("summarize", partial(summarize, llm, vector_store))
     graph_builder.add_edge(START, "summarize")
     graph_builder.add_edge("summarize", END)
 
-    return graph_builder.compile(checkpointer=InMemorySaver())
+    return graph_builder.compile()
 
 
 SummarizeGraph = GraphWrapper[SummarizeGraphState]
 
 
-def build(llm: BaseChatModel, chroma: Chroma) -> SummarizeGraph:
+def build(
+        llm: BaseChatModel,
+        vector_store: AsyncChroma | MemoryMappedVectorStore
+) -> SummarizeGraph:
     return GraphWrapper.from_builder(
         SummarizeGraphState,
         build_graph,
         None,
         llm,
-        chroma
+        vector_store
     )
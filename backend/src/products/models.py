@@ -1,3 +1,4 @@
+from datetime import datetime, timezone
 from pydantic import HttpUrl
 from sqlmodel import SQLModel, Field, Relationship
 from backend.src.common.http_url_type import HttpUrlType
@@ -28,3 +29,15 @@ class Product(ProductBase, table=True):
     id: int | None = Field(default=None, primary_key=True)
     shop_id: int = Field(foreign_key="shop.id")
     shop: "Shop" = Relationship(back_populates="products")
+
+
+class CachedProductSummary(SQLModel, table=True):
+    __tablename__ = "productsummary"
+
+    product_id: int = Field(foreign_key="product.id", primary_key=True, ondelete="CASCADE")
+    summary_length: int = Field(primary_key=True)
+    title_length: int = Field(primary_key=True)
+    model: str = Field(primary_key=True)
+    ai_title: str
+    ai_description: str
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
@@ -1,61 +1,170 @@
-from sqlmodel import Session, select, delete
+from sqlmodel import select, delete, func, and_
+from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel.sql.expression import Select, SelectOfScalar
-from backend.src.products.models import Product, ProductIn
+from sqlalchemy.orm import selectinload
+from sqlalchemy.dialects.postgresql import insert, array
+from backend.src.products.models import Product, ProductIn, CachedProductSummary
 from backend.src.products.graphs.summarize_graph import SummarizeGraph
 from backend.src.products.graphs.summarize_graph_state import ProductSummary
 from backend.src.shops.service import ShopService
+from backend.src.users.models import Bookmark
 
 
 class ProductService:
     def __init__(
             self,
-            session: Session,
+            session: AsyncSession,
             shop_service: ShopService,
-            summarize_graph: SummarizeGraph
+            summarize_graph: SummarizeGraph,
+            summary_model: str
     ):
         self._session = session
         self._shop_service = shop_service
         self._summarize_graph = summarize_graph
+        self._summary_model = summary_model
 
-    def find_all(self) -> list[Product]:
-        return self._query(select(Product)).all()
+    async def find_all(self) -> list[Product]:
+        return (await self._query(select(Product).options(selectinload(Product.shop)))).all()
 
-    def find_by_id(self, id: int) -> Product | None:
-        return self._session.get(Product, id)
+    async def find_by_id(self, id: int) -> Product | None:
+        return await self._session.get(Product, id, options=[selectinload(Product.shop)])
 
-    def find_by_ids(self, ids: list[int]) -> list[Product]:
-        return self._query(select(Product).where(Product.id.in_(ids))).all()
+    async def find_by_ids(self, ids: list[int]) -> list[Product]:
+        return (await self._query(
+            select(Product).where(Product.id.in_(ids)).options(selectinload(Product.shop))
+        )).all()
 
-    def create(self, product_in: ProductIn) -> Product:
-        product = self._validate_new_product(product_in)
+    async def create(self, product_in: ProductIn) -> Product:
+        product = await self._validate_new_product(product_in)
         self._session.add(product)
-        self._session.commit()
-        self._session.refresh(product)
+        await self._session.commit()
+        await self._session.refresh(product, ["shop"])
         return product
 
     def create_batch(self, products_in: list[ProductIn] = ()) -> "ProductService.BatchedCreate":
         return ProductService.BatchedCreate(self, products_in)
 
-    def delete(self, products: list[Product]):
+    async def delete(self, products: list[Product]):
         ids = [product.id for product in products]
-        self._query(delete(Product).where(Product.id.in_(ids)))
-        self._session.commit()
+        await self._query(delete(Product).where(Product.id.in_(ids)))
+        await self._session.commit()
 
-    def summarize(self, ids: list[int], length: int = 100) -> list[ProductSummary]:
-        return self._summarize_graph.invoke(
-            product_ids=ids,
-            summary_length=length
-        ).summarized_products
+    async def find_by_ids_ordered(self, ids: list[int]) -> dict[int, Product]:
+        products = {product.id: product for product in await self.find_by_ids(ids)}
+        return {id: products[id] for id in dict.fromkeys(ids) if id in products}
 
-    def _validate_new_product(self, product_in: ProductIn) -> Product:
-        shop = self._shop_service.find_by_id(product_in.shop_id)
+    async def find_popular_unsummarized_ids(
+            self,
+            limit: int,
+            *,
+            length: int = 100,
+            title_length: int = 7,
+            exclude_ids: set[int] = frozenset()
+    ) -> list[int]:
+        return (await self._query(
+            select(Bookmark.product_id)
+            .outerjoin(CachedProductSummary, and_(
+                CachedProductSummary.product_id == Bookmark.product_id,
+                CachedProductSummary.summary_length == length,
+                CachedProductSummary.title_length == title_length,
+                CachedProductSummary.model == self._summary_model
+            ))
+            .where(CachedProductSummary.product_id.is_(None))
+            .where(Bookmark.product_id.not_in(exclude_ids))
+            .group_by(Bookmark.product_id)
+            .order_by(func.count().desc(), Bookmark.product_id)
+            .limit(limit)
+        )).all()
+
+    async def claim_ids(self, ids: list[int], limit: int) -> list[int]:
+        if not ids:
+            return []
+
+        return (await self._query(
+            select(Product.id)
+            .where(Product.id.in_(ids))
+            .order_by(func.array_position(array(ids), Product.id))
+            .limit(limit)
+            .with_for_update(skip_locked=True, key_share=True)
+        )).all()
+
+    async def summarize(
+            self,
+            ids: list[int],
+            length: int = 100,
+            title_length: int = 7
+    ) -> list[ProductSummary]:
+        summaries = await self._find_summaries(ids, length, title_length)
+
+        if missing_ids := list(dict.fromkeys(id for id in ids if id not in summaries)):
+            new_summaries = {summary.id: summary for summary in (
+                await self._summarize_graph.ainvoke(
+                    product_ids=missing_ids,
+                    summary_length=length,
+                    title_length=title_length
+                )
+            ).summarized_products if summary.id in missing_ids}
+            await self._store_summaries(list(new_summaries.values()), length, title_length)
+            summaries.update(new_summaries)
+
+        return [summaries[id] for id in ids if id in summaries]
+
+    async def _find_summaries(
+            self,
+            ids: list[int],
+            length: int,
+            title_length: int
+    ) -> dict[int, ProductSummary]:
+        cached_summaries = (await self._query(select(CachedProductSummary).where(
+            CachedProductSummary.product_id.in_(ids),
+            CachedProductSummary.summary_length == length,
+            CachedProductSummary.title_length == title_length,
+            CachedProductSummary.model == self._summary_model
+        ))).all()
+
+        return {summary.product_id: ProductSummary(
+            id=summary.product_id,
+            ai_title=summary.ai_title,
+            ai_description=summary.ai_description
+        ) for summary in cached_summaries}
+
+    async def _store_summaries(
+            self,
+            summaries: list[ProductSummary],
+            length: int,
+            title_length: int
+    ):
+        if not summaries:
+            return
+
+        await self._query(insert(CachedProductSummary).values([
+            CachedProductSummary(
+                product_id=summary.id,
+                summary_length=length,
+                title_length=title_length,
+                model=self._summary_model,
+                ai_title=summary.ai_title,
+                ai_description=summary.ai_description
+            ).model_dump() for summary in summaries
+        ]).on_conflict_do_nothing())
+        await self._session.commit()
+
+    async def _validate_new_product(self, product_in: ProductIn) -> Product:
+        shop = await self._shop_service.find_by_id(product_in.shop_id)
         if not shop:
             raise ValueError(f"Invalid shop id {product_in.shop_id}")
 
         return Product.model_validate(product_in)
 
-    def _query(self, query: Select | SelectOfScalar):
-        return self._session.exec(query)
+    async def _validate_new_products(self, products_in: list[ProductIn]) -> list[Product]:
+        shop_ids = {product_in.shop_id for product_in in products_in}
+        if invalid := shop_ids - await self._shop_service.find_existing_ids(shop_ids):
+            raise ValueError(f"Invalid shop ids {sorted(invalid)}")
+
+        return [Product.model_validate(product_in) for product_in in products_in]
+
+    async def _query(self, query: Select | SelectOfScalar):
+        return await self._session.exec(query)
 
     class BatchedCreate:
         def __init__(self, product_service: "ProductService", products_in: list[ProductIn] = ()):
@@ -66,15 +175,13 @@ class ProductService:
             self._products_in.append(product_in)
             return self
 
-        def commit(self) -> list[Product]:
-            products = [self._product_service._validate_new_product(product_in) for product_in in
-                        self._products_in]
-            self._product_service._session.bulk_save_objects(products)
-            self._product_service._session.commit()
+        async def commit(self) -> list[Product]:
+            products = await self._product_service._validate_new_products(self._products_in)
+            self._product_service._session.add_all(products)
+            await self._product_service._session.commit()
             self._products_in = []
 
-            return self._product_service._query(
-                select(Product).order_by(Product.id.desc()).limit(len(products))).all()
+            return products
 
         def __contains__(self, item):
             if isinstance(item, ProductIn):
@@ -0,0 +1,105 @@
+import asyncio
+import logging
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from backend.src.products.service import ProductService
+from backend.src.products.graphs.summarize_graph import SummarizeGraph
+from backend.src.shops.service import ShopService
+
+log = logging.getLogger(__name__)
+
+
+class ProductSummaryWorker:
+    def __init__(
+            self,
+            db_engine: AsyncEngine,
+            summarize_graph: SummarizeGraph,
+            summary_model: str,
+            *,
+            enabled: bool = True,
+            interval: float = 300,
+            batch_size: int = 20,
+            claim_factor: int = 2
+    ):
+        self._db_engine = db_engine
+        self._summarize_graph = summarize_graph
+        self._summary_model = summary_model
+        self._interval = interval
+        self._batch_size = batch_size
+        self._claim_factor = claim_factor
+        self._enabled = enabled
+        self._failed_ids: set[int] = set()
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        if self._enabled and self._interval > 0 and not self._task:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def summarize_batch(self) -> int:
+        # Claimed rows stay locked until the claim session closes, so concurrent workers in other
+        # processes skip the products this batch is summarizing
+        async with (
+            AsyncSession(self._db_engine, expire_on_commit=False) as claim_session,
+            AsyncSession(self._db_engine, expire_on_commit=False) as session
+        ):
+            product_service = self._create_product_service(session)
+            candidate_ids = await product_service.find_popular_unsummarized_ids(
+                self._batch_size * self._claim_factor,
+                exclude_ids=self._failed_ids
+            )
+            ids = await self._create_product_service(claim_session).claim_ids(
+                candidate_ids,
+                self._batch_size
+            )
+
+            if not ids:
+                return 0
+
+            try:
+                summarized_ids = {s.id for s in await product_service.summarize(ids)}
+            except Exception as e:
+                log.warning("Batch summary failed, retrying products one by one: %s", str(e))
+                await session.rollback()
+                summarized_ids = {
+                    id for id in ids if await self._summarize_single(session, product_service, id)
+                }
+
+            self._failed_ids.update(set(ids) - summarized_ids)
+            return len(ids)
+
+    async def _run(self):
+        while True:
+            try:
+                while await self.summarize_batch() == self._batch_size:
+                    pass
+            except Exception as e:
+                log.error("Product summary precomputation failed: %s", str(e))
+
+            await asyncio.sleep(self._interval)
+
+    def _create_product_service(self, session: AsyncSession) -> ProductService:
+        return ProductService(
+            session,
+            ShopService(session),
+            self._summarize_graph,
+            self._summary_model
+        )
+
+    async def _summarize_single(
+            self,
+            session: AsyncSession,
+            product_service: ProductService,
+            id: int
+    ) -> bool:
+        try:
+            return len(await product_service.summarize([id])) > 0
+        except Exception as e:
+            log.warning("Skipping summary of product %s: %s", id, str(e))
+            await session.rollback()
+            return False
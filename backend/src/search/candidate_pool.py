@@ -0,0 +1,87 @@
+import json
+import base64
+import hashlib
+import binascii
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from backend.src.common.lru_cache import LruCache
+from backend.src.search.models import RecommendationQuery
+from backend.src.search.diversifier import Diversifier
+from backend.src.search.graphs.retrieve_graph import retrieve_with_relaxation
+
+
+class CandidatePool:
+    def __init__(
+            self,
+            retriever: BaseRetriever,
+            rerank_retriever: BaseRetriever,
+            diversifier: Diversifier | None = None,
+            *,
+            page_size: int,
+            max_size: int = 1000,
+            ttl: float = 1800
+    ):
+        self._retriever = retriever
+        self._rerank_retriever = rerank_retriever
+        self._diversifier = diversifier
+        self._page_size = page_size
+        self._pools = LruCache[tuple[int, RecommendationQuery], list[Document]](
+            max_size=max_size,
+            ttl=ttl
+        )
+
+    @property
+    def page_size(self) -> int:
+        return self._page_size
+
+    async def get_page(
+            self,
+            thread_id: int,
+            query: RecommendationQuery,
+            offset: int
+    ) -> tuple[list[Document], int | None]:
+        key = (thread_id, query)
+
+        if (candidates := self._pools.get(key)) is None:
+            retriever = self._rerank_retriever if query.rerank else self._retriever
+            documents = await retrieve_with_relaxation(retriever, query.query, query.filters)
+
+            if self._diversifier:
+                documents = await self._diversifier.diversify(
+                    query.query,
+                    documents,
+                    len(documents),
+                    preserve_order=query.rerank
+                )
+
+            candidates = [
+                Document(d.page_content, metadata={"ref_id": d.metadata.get("ref_id")})
+                for d in documents
+            ]
+            self._pools.put(key, candidates)
+
+        end = offset + self._page_size
+        return candidates[offset:end], end if end < len(candidates) else None
+
+    def encode_cursor(self, query: RecommendationQuery, offset: int) -> str:
+        cursor = json.dumps({"offset": offset, "query": self._fingerprint(query)})
+        return base64.urlsafe_b64encode(cursor.encode()).decode()
+
+    def decode_cursor(self, query: RecommendationQuery, cursor: str) -> int:
+        try:
+            decoded = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            offset = decoded["offset"]
+            fingerprint = decoded["query"]
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            raise ValueError("Invalid cursor")
+
+        if fingerprint != self._fingerprint(query) or not isinstance(offset, int) or offset < 0:
+            raise ValueError("Cursor does not match the current search")
+
+        return offset
+
+    def stats(self) -> dict:
+        return self._pools.stats()
+
+    def _fingerprint(self, query: RecommendationQuery) -> str:
+        return hashlib.sha256(query.model_dump_json().encode()).hexdigest()[:16]
@@ -0,0 +1,109 @@
+import re
+import asyncio
+import logging
+import numpy as np
+from typing import Awaitable, Callable
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores.utils import maximal_marginal_relevance
+from backend.src.common.bm25_index import tokenize
+
+log = logging.getLogger(__name__)
+
+TITLE_SEPARATORS = re.compile(r"\s[-|]\s|[,(\[]")
+MIN_STEM_TOKENS = 3
+
+
+class Diversifier:
+    def __init__(
+            self,
+            embeddings: Embeddings,
+            stored_embeddings: Callable[[list[str]], Awaitable[dict[str, list[float]]]],
+            *,
+            duplicate_threshold: float = 0.95,
+            lambda_mult: float = 0.7
+    ):
+        self._embeddings = embeddings
+        self._stored_embeddings = stored_embeddings
+        self._duplicate_threshold = duplicate_threshold
+        self._lambda_mult = lambda_mult
+
+    async def diversify(
+            self,
+            query: str,
+            documents: list[Document],
+            k: int,
+            *,
+            preserve_order: bool = False
+    ) -> list[Document]:
+        if len(documents) <= 1:
+            return documents[:k]
+
+        if preserve_order:
+            kept = self._collapse_duplicates(documents, await self._document_vectors(documents))
+            self._log_collapsed(documents, kept)
+            return [documents[i] for i in kept[:k]]
+
+        query_embedding, vectors = await asyncio.gather(
+            self._embeddings.aembed_query(query),
+            self._document_vectors(documents)
+        )
+        kept = self._collapse_duplicates(documents, vectors)
+        self._log_collapsed(documents, kept)
+
+        selected = maximal_marginal_relevance(
+            np.asarray(query_embedding, dtype=np.float32),
+            [vectors[i] for i in kept],
+            lambda_mult=self._lambda_mult,
+            k=min(k, len(kept))
+        )
+        return [documents[kept[i]] for i in selected]
+
+    def _log_collapsed(self, documents: list[Document], kept: list[int]):
+        if len(kept) < len(documents):
+            log.debug("Collapsed %s near-duplicate documents", len(documents) - len(kept))
+
+    async def _document_vectors(self, documents: list[Document]) -> np.ndarray:
+        stored = await self._stored_embeddings([d.id for d in documents if d.id])
+        embeddings = [stored.get(d.id) for d in documents]
+
+        if missing := [i for i, embedding in enumerate(embeddings) if embedding is None]:
+            embedded = await self._embeddings.aembed_documents(
+                [documents[i].page_content for i in missing]
+            )
+            for i, embedding in zip(missing, embedded):
+                embeddings[i] = embedding
+
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+    def _collapse_duplicates(self, documents: list[Document], vectors: np.ndarray) -> list[int]:
+        kept: list[int] = []
+        seen_groups: set[str] = set()
+
+        for i, document in enumerate(documents):
+            groups = self._duplicate_groups(document)
+
+            if groups & seen_groups:
+                continue
+
+            if kept and np.max(vectors[kept] @ vectors[i]) >= self._duplicate_threshold:
+                continue
+
+            kept.append(i)
+            seen_groups |= groups
+
+        return kept
+
+    def _duplicate_groups(self, document: Document) -> set[str]:
+        groups = set()
+
+        if parent_asin := document.metadata.get("parent_asin"):
+            groups.add(f"asin:{parent_asin}")
+
+        title = TITLE_SEPARATORS.split(document.page_content, maxsplit=1)[0]
+        if len(stem := tokenize(title)) >= MIN_STEM_TOKENS:
+            groups.add(f"title:{' '.join(stem)}")
+
+        return groups
@@ -0,0 +1,78 @@
+import asyncio
+import logging
+from pydantic import PrivateAttr
+from langchain_core.callbacks import CallbackManagerForRetrieverRun, \
+    AsyncCallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+log = logging.getLogger(__name__)
+
+
+class DualReadStats:
+    def __init__(self):
+        self._reads = 0
+        self._errors = 0
+        self._overlap = 0.0
+
+    def record(self, primary: list[Document], shadow: list[Document]):
+        primary_ids = {document.metadata.get("ref_id") for document in primary}
+        shadow_ids = {document.metadata.get("ref_id") for document in shadow}
+        self._reads += 1
+        self._overlap += len(primary_ids & shadow_ids) / len(primary_ids) if primary_ids else 1.0
+
+    def record_error(self):
+        self._errors += 1
+
+    def stats(self) -> dict:
+        return {
+            "shadow_reads": self._reads,
+            "shadow_errors": self._errors,
+            "mean_overlap": self._overlap / self._reads if self._reads else 0.0
+        }
+
+
+class DualReadRetriever(BaseRetriever):
+    primary: BaseRetriever
+    shadow: BaseRetriever
+    dual_read_stats: DualReadStats
+
+    _pending: set[asyncio.Task] = PrivateAttr(default_factory=set)
+
+    def _get_relevant_documents(
+            self,
+            query: str,
+            *,
+            run_manager: CallbackManagerForRetrieverRun,
+            **kwargs
+    ) -> list[Document]:
+        return self.primary.invoke(query, config={"callbacks": run_manager.get_child()}, **kwargs)
+
+    async def _aget_relevant_documents(
+            self,
+            query: str,
+            *,
+            run_manager: AsyncCallbackManagerForRetrieverRun,
+            **kwargs
+    ) -> list[Document]:
+        documents = await self.primary.ainvoke(
+            query,
+            config={"callbacks": run_manager.get_child()},
+            **kwargs
+        )
+
+        task = asyncio.create_task(self._compare_shadow(query, documents, kwargs))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+        return documents
+
+    async def _compare_shadow(self, query: str, documents: list[Document], kwargs: dict):
+        try:
+            shadow_documents = await self.shadow.ainvoke(query, **kwargs)
+        except Exception as e:
+            log.warning("Shadow read failed: %s", str(e))
+            self.dual_read_stats.record_error()
+            return
+
+        self.dual_read_stats.record(documents, shadow_documents)
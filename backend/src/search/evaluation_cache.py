@@ -0,0 +1,90 @@
+import re
+import numpy as np
+from pydantic import BaseModel
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import AnyMessage
+from backend.src.common.lru_cache import LruCache
+from backend.src.search.graphs.search_graph_state import QueryEvaluation
+
+
+class CachedQueryEvaluation(BaseModel):
+    query_evaluation: QueryEvaluation
+    messages: list[AnyMessage]
+    embedding: list[float] | None = None
+
+
+class QueryEvaluationCache:
+    def __init__(
+            self,
+            embeddings: Embeddings | None = None,
+            *,
+            max_size: int = 1000,
+            ttl: float = 3600,
+            similarity_threshold: float = 0.95
+    ):
+        self._embeddings = embeddings
+        self._similarity_threshold = similarity_threshold
+        self._entries = LruCache[str, CachedQueryEvaluation](max_size=max_size, ttl=ttl)
+        self._pending_embeddings = LruCache[str, list[float]](max_size=max_size, ttl=ttl)
+        self._semantic_hits = 0
+
+    async def get(self, query: str) -> CachedQueryEvaluation | None:
+        key = self._normalize(query)
+
+        if entry := self._entries.get(key):
+            return entry
+
+        if self._embeddings and (entry := await self._find_similar(key)):
+            self._semantic_hits += 1
+            return entry
+
+        return None
+
+    async def put(self, query: str, query_evaluation: QueryEvaluation, messages: list[AnyMessage]):
+        key = self._normalize(query)
+        embedding = self._pending_embeddings.get(key)
+
+        if self._embeddings and not embedding:
+            embedding = self._unit_vector(await self._embeddings.aembed_query(key))
+
+        self._entries.put(key, CachedQueryEvaluation(
+            query_evaluation=query_evaluation,
+            messages=messages,
+            embedding=embedding
+        ))
+
+    def stats(self) -> dict:
+        stats = self._entries.stats()
+        hits = stats["hits"] + self._semantic_hits
+        lookups = stats["hits"] + stats["misses"]
+        return {
+            "size": stats["size"],
+            "exact_hits": stats["hits"],
+            "semantic_hits": self._semantic_hits,
+            "misses": stats["misses"] - self._semantic_hits,
+            "hit_rate": hits / lookups if lookups else 0.0
+        }
+
+    async def _find_similar(self, key: str) -> CachedQueryEvaluation | None:
+        embedding = self._unit_vector(await self._embeddings.aembed_query(key))
+        candidates = [(k, e) for k, e in self._entries.items() if e.embedding]
+
+        if candidates:
+            similarities = np.array([e.embedding for _, e in candidates]) @ np.array(embedding)
+            best = int(np.argmax(similarities))
+
+            if similarities[best] >= self._similarity_threshold:
+                best_key, entry = candidates[best]
+                self._entries.touch(best_key)
+                return entry
+
+        self._pending_embeddings.put(key, embedding)
+        return None
+
+    def _normalize(self, query: str) -> str:
+        return re.sub(r"\s+", " ", query.lower()).strip(" .!?")
+
+    def _unit_vector(self, embedding: list[float]) -> list[float]:
+        vector = np.array(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
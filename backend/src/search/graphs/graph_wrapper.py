@@ -1,4 +1,4 @@
-from typing import Annotated, List, Generic, TypeVar, Callable
+from typing import Annotated, List, Generic, TypeVar, Callable, AsyncIterator, Any
 from pydantic import BaseModel, ValidationError
 from langchain_core.runnables import RunnableConfig
 from langchain_core.messages import AnyMessage, HumanMessage, AIMessage, SystemMessage
@@ -24,22 +24,55 @@ class GraphWrapper(Generic[T]):
         self._prompt = prompt
         self._state_schema = state_schema
 
+    @property
+    def is_stateless(self) -> bool:
+        return self._graph.checkpointer is None
+
     def invoke(self, input: T | str = None, config: RunnableConfig = DEFAULT_CONFIG, **kwargs) -> T:
         past_messages = self.get_dict_state(config).get("messages")
-        system_message = [SystemMessage(self._prompt)] if not past_messages and self._prompt else []
-
-        if not input:
-            state = self._state_schema(**kwargs)
-            input_messages = kwargs.get("messages", [])
-            graph_input = {**state.model_dump(), "messages": [*system_message, *input_messages]}
-        elif isinstance(input, str):
-            graph_input = {"messages": [*system_message, HumanMessage(input)]}
-        else:
-            graph_input = {**input.model_dump(), "messages": [*system_message, *input.messages]}
-
+        graph_input = self._create_graph_input(input, past_messages, **kwargs)
         result = self._graph.invoke(graph_input, config)
         return self._state_schema(**result)
 
+    async def ainvoke(
+            self,
+            input: T | str = None,
+            config: RunnableConfig = DEFAULT_CONFIG,
+            **kwargs
+    ) -> T:
+        past_messages = (await self.aget_dict_state(config)).get("messages")
+        graph_input = self._create_graph_input(input, past_messages, **kwargs)
+        result = await self._graph.ainvoke(graph_input, config)
+        return self._state_schema(**result)
+
+    async def astream(
+            self,
+            input: T | str = None,
+            config: RunnableConfig = DEFAULT_CONFIG,
+            **kwargs
+    ) -> AsyncIterator[tuple[str, Any]]:
+        past_messages = (await self.aget_dict_state(config)).get("messages")
+        graph_input = self._create_graph_input(input, past_messages, **kwargs)
+
+        async for mode, chunk in self._graph.astream(
+                graph_input,
+                config,
+                stream_mode=["updates", "custom"]
+        ):
+            yield mode, chunk
+
+    async def aupdate_state(
+            self,
+            input: T | str = None,
+            config: RunnableConfig = DEFAULT_CONFIG,
+            *,
+            as_node: str = None,
+            **kwargs
+    ):
+        past_messages = (await self.aget_dict_state(config)).get("messages")
+        values = self._create_graph_input(input, past_messages, **kwargs)
+        await self._graph.aupdate_state(config, values, as_node=as_node)
+
     def get_state(self, config: RunnableConfig = DEFAULT_CONFIG) -> T | None:
         try:
             state_values = self.get_dict_state(config)
@@ -47,9 +80,37 @@ class GraphWrapper(Generic[T]):
         except ValidationError:
             return None
 
+    async def aget_state(self, config: RunnableConfig = DEFAULT_CONFIG) -> T | None:
+        try:
+            state_values = await self.aget_dict_state(config)
+            return self._state_schema(**state_values)
+        except ValidationError:
+            return None
+
     def get_dict_state(self, config: RunnableConfig = DEFAULT_CONFIG):
+        if self.is_stateless:
+            return {}
+
         return self._graph.get_state(config).values
 
+    async def aget_dict_state(self, config: RunnableConfig = DEFAULT_CONFIG):
+        if self.is_stateless:
+            return {}
+
+        return (await self._graph.aget_state(config)).values
+
+    def _create_graph_input(self, input: T | str | None, past_messages: list | None, **kwargs):
+        system_message = [SystemMessage(self._prompt)] if not past_messages and self._prompt else []
+
+        if not input:
+            state = self._state_schema(**kwargs)
+            input_messages = kwargs.get("messages", [])
+            return {**state.model_dump(), "messages": [*system_message, *input_messages]}
+        elif isinstance(input, str):
+            return {"messages": [*system_message, HumanMessage(input)]}
+        else:
+            return {**input.model_dump(), "messages": [*system_message, *input.messages]}
+
     @classmethod
     def from_builder(
             cls,
@@ -1,10 +1,21 @@
+import asyncio
+import logging
+from functools import partial
+from typing import Callable
+from langchain_core.documents import Document
 from langchain_core.language_models import BaseChatModel
 from langchain_core.retrievers import BaseRetriever
+from langgraph.config import get_stream_writer
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.state import CompiledStateGraph
-from langgraph.checkpoint.memory import InMemorySaver
+from backend.src.common.batching_cross_encoder import BatchingCrossEncoder
 from backend.src.search.graphs.graph_wrapper import GraphWrapper
-from backend.src.search.graphs.retrieve_graph_state import RetrieveGraphState, RelevanceScoreList
+from backend.src.search.graphs.retrieve_graph_state import RetrieveGraphState, \
+    RelevanceScoreList, RelevanceFilter
+from backend.src.search.query_filters import QueryFilters
+from backend.src.search.diversifier import Diversifier
+
+log = logging.getLogger(__name__)
 
 FILTER_DOCS_PROMPT = (
     """
@@ -38,35 +49,152 @@ evaluation for every document presented.
 )
 
 
-def retrieve(retriever: BaseRetriever, s: RetrieveGraphState):
-    def invoke(state: RetrieveGraphState):
-        documents = retriever.invoke(state.query)
-        return {"retrieved_documents": documents}
+async def retrieve_with_relaxation(
+        retriever: BaseRetriever,
+        query: str,
+        filters: QueryFilters | None
+) -> list[Document]:
+    wheres = filters.relaxations() if filters else [None]
+
+    for where in wheres:
+        documents = await retriever.ainvoke(query, **({"filter": where} if where else {}))
+        if documents:
+            break
+
+    return documents
+
+
+async def retrieve(
+        retriever: BaseRetriever,
+        diversifier: Diversifier | None,
+        max_results: int | None,
+        ranked: bool,
+        s: RetrieveGraphState
+):
+    async def invoke(state: RetrieveGraphState):
+        documents = await retrieve_with_relaxation(retriever, state.query, state.filters)
+        k = max_results or len(documents)
+
+        if diversifier:
+            documents = await diversifier.diversify(
+                state.query,
+                documents,
+                k,
+                preserve_order=ranked
+            )
+
+        return {"retrieved_documents": documents[:k]}
+
+    return await invoke(s)
+
+
+async def grade_with_llm(
+        llm: BaseChatModel,
+        query: str,
+        documents: list[Document],
+        *,
+        chunk_size: int = 5,
+        max_concurrency: int = 4,
+        on_graded: Callable[[list[Document]], None] | None = None
+) -> list[Document]:
+    if not documents:
+        return []
+
+    chunks = [documents[i:i + chunk_size] for i in range(0, len(documents), chunk_size)]
+    prompts = [FILTER_DOCS_PROMPT.format(
+        query=query,
+        documents="\n\n".join(map(
+            lambda d: f"Document ID: {d.metadata.get('ref_id')}\nContent: {d.page_content}",
+            chunk
+        ))
+    ) for chunk in chunks]
+
+    grader = llm.with_structured_output(RelevanceScoreList)
+    semaphore = asyncio.Semaphore(max_concurrency)
 
-    return invoke(s)
+    async def grade_chunk(index: int, chunk: list[Document], prompt: str):
+        async with semaphore:
+            try:
+                rankings = await grader.ainvoke(prompt)
+            except Exception as e:
+                log.warning("Grading %s documents failed, keeping them ungraded: %s",
+                            len(chunk), str(e))
+                return index, chunk
 
+        relevant_ids = {ranking.id for ranking in rankings.list if ranking.relevant}
+        return index, [d for d in chunk if d.metadata.get("ref_id") in relevant_ids]
 
-def filter_relevant(llm: BaseChatModel, s: RetrieveGraphState):
-    def invoke(state: RetrieveGraphState):
-        prompt = FILTER_DOCS_PROMPT.format(
-            query=state.query,
-            documents="\n\n".join(map(
-                lambda d: f"Document ID: {d.metadata.get('ref_id')}\nContent: {d.page_content}",
-                state.retrieved_documents
-            ))
+    graded: list[list[Document]] = [[] for _ in chunks]
+
+    for next_graded in asyncio.as_completed([
+        grade_chunk(index, chunk, prompt)
+        for index, (chunk, prompt) in enumerate(zip(chunks, prompts))
+    ]):
+        index, relevant_documents = await next_graded
+        graded[index] = relevant_documents
+
+        if relevant_documents and on_graded:
+            on_graded(relevant_documents)
+
+    return [d for relevant_documents in graded for d in relevant_documents]
+
+
+async def score_with_cross_encoder(
+        cross_encoder: BatchingCrossEncoder,
+        query: str,
+        documents: list[Document]
+) -> list[float]:
+    if not documents:
+        return []
+
+    return await cross_encoder.ascore([(query, d.page_content) for d in documents])
+
+
+async def filter_relevant(
+        llm: BaseChatModel,
+        cross_encoder: BatchingCrossEncoder,
+        relevance_threshold: float,
+        borderline_margin: float,
+        grading_chunk_size: int,
+        grading_concurrency: int,
+        s: RetrieveGraphState
+):
+    async def invoke(state: RetrieveGraphState):
+        documents = state.retrieved_documents
+        write = get_stream_writer()
+        grade = partial(
+            grade_with_llm,
+            llm,
+            state.query,
+            chunk_size=grading_chunk_size,
+            max_concurrency=grading_concurrency,
+            on_graded=lambda relevant: write({"relevant_documents": relevant})
         )
 
-        rankings = llm.with_structured_output(RelevanceScoreList).invoke(prompt)
-        relevant_ids = [ranking.id for ranking in rankings.list if ranking.relevant]
+        if state.relevance_filter == RelevanceFilter.LLM:
+            return {"relevant_documents": await grade(documents)}
+
+        scores = await score_with_cross_encoder(cross_encoder, state.query, documents)
+        margin = borderline_margin if state.relevance_filter == RelevanceFilter.HYBRID else 0
+        accepted = [d for d, score in zip(documents, scores) if
+                    score >= relevance_threshold + margin]
+        borderline = [d for d, score in zip(documents, scores) if
+                      relevance_threshold - margin <= score < relevance_threshold + margin]
+
+        if accepted:
+            write({"relevant_documents": accepted})
 
-        return {"relevant_documents": [
-            d for d in state.retrieved_documents if d.metadata.get("ref_id") in relevant_ids
-        ]}
+        escalated = await grade(borderline)
+        relevant_ids = {id(d) for d in accepted + escalated}
+        return {"relevant_documents": [d for d in documents if id(d) in relevant_ids]}
 
-    return invoke(s)
+    return await invoke(s)
 
 
 def rerank_or_retrieve(state: RetrieveGraphState):
+    if state.retrieved_documents:
+        return "filter"
+
     return "rerank" if state.rerank_documents else "retrieve"
 
 
@@ -77,19 +205,37 @@ def summarize_or_end(state: RetrieveGraphState):
 def build_graph(
         llm: BaseChatModel,
         retriever: BaseRetriever,
-        reranker: BaseRetriever
+        reranker: BaseRetriever,
+        cross_encoder: BatchingCrossEncoder,
+        relevance_threshold: float = 0.5,
+        borderline_margin: float = 0.3,
+        grading_chunk_size: int = 5,
+        grading_concurrency: int = 4,
+        diversifier: Diversifier | None = None,
+        max_results: int | None = None
 ) -> CompiledStateGraph:
     graph_builder = StateGraph(RetrieveGraphState)
 
-    graph_builder.add_node("retrieve", lambda state: retrieve(retriever, state))
-    graph_builder.add_node("rerank", lambda state: retrieve(reranker, state))
-    graph_builder.add_node("filter", lambda state: filter_relevant(llm, state))
+    graph_builder.add_node(
+        "retrieve",
+        partial(retrieve, retriever, diversifier, max_results, False)
+    )
+    graph_builder.add_node("rerank", partial(retrieve, reranker, diversifier, max_results, True))
+    graph_builder.add_node("filter", partial(
+        filter_relevant,
+        llm,
+        cross_encoder,
+        relevance_threshold,
+        borderline_margin,
+        grading_chunk_size,
+        grading_concurrency
+    ))
     graph_builder.add_conditional_edges(START, rerank_or_retrieve)
     graph_builder.add_edge("rerank", "filter")
     graph_builder.add_edge("retrieve", "filter")
     graph_builder.add_edge("filter", END)
 
-    return graph_builder.compile(checkpointer=InMemorySaver())
+    return graph_builder.compile()
 
 
 RetrieveGraph = GraphWrapper[RetrieveGraphState]
@@ -98,7 +244,14 @@ RetrieveGraph = GraphWrapper[RetrieveGraphState]
 def build(
         llm: BaseChatModel,
         retriever: BaseRetriever,
-        reranker: BaseRetriever
+        reranker: BaseRetriever,
+        cross_encoder: BatchingCrossEncoder,
+        relevance_threshold: float = 0.5,
+        borderline_margin: float = 0.3,
+        grading_chunk_size: int = 5,
+        grading_concurrency: int = 4,
+        diversifier: Diversifier | None = None,
+        max_results: int | None = None
 ) -> RetrieveGraph:
     return GraphWrapper.from_builder(
         RetrieveGraphState,
@@ -106,5 +259,12 @@ def build(
         None,
         llm,
         retriever,
-        reranker
+        reranker,
+        cross_encoder,
+        relevance_threshold,
+        borderline_margin,
+        grading_chunk_size,
+        grading_concurrency,
+        diversifier,
+        max_results
     )
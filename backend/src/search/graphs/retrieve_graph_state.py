@@ -1,7 +1,9 @@
+from enum import Enum
 from typing import List
 from pydantic import BaseModel, Field
 from langchain_core.documents import Document
 from backend.src.search.graphs.graph_wrapper import MessageState
+from backend.src.search.query_filters import QueryFilters
 
 
 class RelevanceScore(BaseModel):
@@ -17,8 +19,16 @@ class RelevanceScoreList(BaseModel):
     list: List[RelevanceScore] = Field(description="Relevance scores of documents")
 
 
+class RelevanceFilter(str, Enum):
+    LLM = "llm"
+    CROSS_ENCODER = "cross_encoder"
+    HYBRID = "hybrid"
+
+
 class RetrieveGraphState(MessageState):
     query: str
     rerank_documents: bool = False
+    relevance_filter: RelevanceFilter = RelevanceFilter.LLM
+    filters: QueryFilters | None = None
     retrieved_documents: List[Document] = []
     relevant_documents: List[Document] = []
@@ -1,4 +1,5 @@
 from typing import Annotated
+from functools import partial
 from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import ToolMessage
 from langchain_core.tools import tool, InjectedToolCallId
@@ -123,18 +124,18 @@ def structured_response(
     })
 
 
-def chat_model(llm: BaseChatModel, s: SearchGraphState):
-    def invoke(state: SearchGraphState):
-        return {"messages": [llm.invoke(state.messages)]}
+async def chat_model(llm: BaseChatModel, s: SearchGraphState):
+    async def invoke(state: SearchGraphState):
+        return {"messages": [await llm.ainvoke(state.messages)]}
 
-    return invoke(s)
+    return await invoke(s)
 
 
 def build_graph(llm: BaseChatModel, memory: BaseCheckpointSaver) -> CompiledStateGraph:
     llm_with_tools = llm.bind_tools([structured_response], tool_choice="any")
     graph_builder = StateGraph(SearchGraphState)
 
-    graph_builder.add_node("llm", lambda state: chat_model(llm_with_tools, state))
+    graph_builder.add_node("llm", partial(chat_model, llm_with_tools))
     graph_builder.add_node("tools", ToolNode(tools=[structured_response]))
     graph_builder.add_edge(START, "llm")
     graph_builder.add_conditional_edges("llm", tools_condition)
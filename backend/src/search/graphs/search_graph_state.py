@@ -40,6 +40,18 @@ class QueryEvaluation(BaseModel):
             "retaining semantic meaning, used for distance-based similarity search"
         )
     )
+    min_price: float | None = Field(
+        default=None,
+        description="Lower price bound in USD the user asked for, if any"
+    )
+    max_price: float | None = Field(
+        default=None,
+        description="Upper price bound in USD the user asked for, if any"
+    )
+    brand: str | None = Field(
+        default=None,
+        description="Brand the user explicitly asked for, if any"
+    )
 
 
 class SearchGraphState(MessageState):
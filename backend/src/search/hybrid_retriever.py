@@ -0,0 +1,59 @@
+import asyncio
+from langchain_core.callbacks import CallbackManagerForRetrieverRun, \
+    AsyncCallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.runnables.config import run_in_executor
+from backend.src.common.bm25_index import Bm25Index
+
+
+class HybridRetriever(BaseRetriever):
+    vector_retriever: BaseRetriever
+    lexical_index: Bm25Index
+    k: int = 4
+    rrf_k: int = 60
+
+    def _get_relevant_documents(
+            self,
+            query: str,
+            *,
+            run_manager: CallbackManagerForRetrieverRun,
+            filter: dict | None = None
+    ) -> list[Document]:
+        vector_documents = self.vector_retriever.invoke(
+            query,
+            config={"callbacks": run_manager.get_child()},
+            **({"filter": filter} if filter else {})
+        )
+        lexical_results = self.lexical_index.search(query, self.k, filter)
+        return self._fuse(vector_documents, [document for document, _ in lexical_results])
+
+    async def _aget_relevant_documents(
+            self,
+            query: str,
+            *,
+            run_manager: AsyncCallbackManagerForRetrieverRun,
+            filter: dict | None = None
+    ) -> list[Document]:
+        vector_documents, lexical_results = await asyncio.gather(
+            self.vector_retriever.ainvoke(
+                query,
+                config={"callbacks": run_manager.get_child()},
+                **({"filter": filter} if filter else {})
+            ),
+            run_in_executor(None, self.lexical_index.search, query, self.k, filter)
+        )
+        return self._fuse(vector_documents, [document for document, _ in lexical_results])
+
+    def _fuse(self, *rankings: list[Document]) -> list[Document]:
+        scores: dict[int, float] = {}
+        documents: dict[int, Document] = {}
+
+        for ranking in rankings:
+            for rank, document in enumerate(ranking):
+                ref_id = document.metadata.get("ref_id")
+                scores[ref_id] = scores.get(ref_id, 0.0) + 1 / (self.rrf_k + rank + 1)
+                documents.setdefault(ref_id, document)
+
+        ranked_ids = sorted(scores, key=scores.get, reverse=True)[:self.k]
+        return [documents[ref_id] for ref_id in ranked_ids]
@@ -1,7 +1,9 @@
 from abc import ABC
 from typing import List
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ConfigDict
 from backend.src.search.graphs.search_graph_state import QueryEvaluation
+from backend.src.search.graphs.retrieve_graph_state import RelevanceFilter
+from backend.src.search.query_filters import QueryFilters
 from backend.src.products.models import ProductBase
 from backend.src.shops.models import ShopBase
 
@@ -62,7 +64,29 @@ class QueryEvaluationOut(QueryEvaluation):
     thread_id: int
 
 
+class RecommendationQuery(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    query: str
+    filters: QueryFilters = QueryFilters()
+    rerank: bool = False
+    relevance_filter: RelevanceFilter = RelevanceFilter.LLM
+
+    def to_graph_input(self) -> dict:
+        return {
+            "query": self.query,
+            "filters": self.filters,
+            "rerank_documents": self.rerank,
+            "relevance_filter": self.relevance_filter
+        }
+
+
 class ProductRecommendation(ProductBase):
     id: int
     description: str
     shop: ShopBase
+
+
+class RecommendationPage(BaseModel):
+    recommendations: list[ProductRecommendation]
+    next_cursor: str | None = None
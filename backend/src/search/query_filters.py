@@ -0,0 +1,90 @@
+import re
+from pydantic import BaseModel, ConfigDict
+from backend.src.search.graphs.search_graph_state import QueryEvaluation
+
+AMOUNT = (
+    r"(\$\s*)?((?:\d{1,3}(?:,\d{3})+(?!\d)|\d+)(?:\.\d{1,2})?)"
+    r"(\s*(?:\$|usd|dollars?|bucks))?"
+)
+UPPER_BOUND = re.compile(
+    rf"(?:under|below|less than|cheaper than|up to|at most|no more than|max(?:imum)?)\s*{AMOUNT}"
+)
+LOWER_BOUND = re.compile(rf"(?:over|above|more than|at least|min(?:imum)?)\s*{AMOUNT}")
+PRICE_RANGES = [
+    re.compile(rf"between\s*{AMOUNT}\s*(?:and|-|to)\s*{AMOUNT}"),
+    re.compile(rf"{AMOUNT}\s*(?:-|to)\s*{AMOUNT}")
+]
+
+
+class QueryFilters(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    min_price: float | None = None
+    max_price: float | None = None
+    shop: str | None = None
+
+    @classmethod
+    def from_query_evaluation(cls, query_evaluation: QueryEvaluation) -> "QueryFilters":
+        parsed_min, parsed_max = parse_price_bounds(query_evaluation.cleaned_query or "")
+        min_price = query_evaluation.min_price or parsed_min
+        max_price = query_evaluation.max_price or parsed_max
+
+        if min_price and max_price and min_price > max_price:
+            min_price, max_price = max_price, min_price
+
+        brand = (query_evaluation.brand or "").strip().lower()
+        return cls(min_price=min_price, max_price=max_price, shop=brand or None)
+
+    def is_empty(self) -> bool:
+        return self.min_price is None and self.max_price is None and self.shop is None
+
+    def without_shop(self) -> "QueryFilters":
+        return QueryFilters(min_price=self.min_price, max_price=self.max_price)
+
+    def relaxations(self) -> list[dict | None]:
+        wheres = [self.to_where(), self.without_shop().to_where(), None]
+        return [where for i, where in enumerate(wheres) if where not in wheres[:i]]
+
+    def to_where(self) -> dict | None:
+        conditions = []
+
+        if self.min_price is not None:
+            conditions.append({"price": {"$gte": self.min_price}})
+        if self.max_price is not None:
+            conditions.append({"price": {"$lte": self.max_price}})
+        if self.shop is not None:
+            conditions.append({"shop": {"$eq": self.shop}})
+
+        if len(conditions) > 1:
+            return {"$and": conditions}
+
+        return conditions[0] if conditions else None
+
+
+def parse_price_bounds(text: str) -> tuple[float | None, float | None]:
+    text = text.lower()
+
+    for pattern in PRICE_RANGES:
+        for match in pattern.finditer(text):
+            if _has_currency(match.group(1), match.group(3), match.group(4), match.group(6)):
+                return _to_float(match.group(2)), _to_float(match.group(5))
+
+    min_price = _find_amount(LOWER_BOUND, text)
+    max_price = _find_amount(UPPER_BOUND, text)
+    return min_price, max_price
+
+
+def _find_amount(pattern: re.Pattern, text: str) -> float | None:
+    for match in pattern.finditer(text):
+        if _has_currency(match.group(1), match.group(3)):
+            return _to_float(match.group(2))
+
+    return None
+
+
+def _to_float(amount: str) -> float:
+    return float(amount.replace(",", ""))
+
+
+def _has_currency(*markers: str | None) -> bool:
+    return any(markers)
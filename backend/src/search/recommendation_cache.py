@@ -0,0 +1,62 @@
+import time
+from typing import Awaitable, Callable, Hashable
+from langchain_core.documents import Document
+from backend.src.common.lru_cache import LruCache
+from backend.src.search.models import RecommendationQuery
+
+
+class RecommendationCache:
+    def __init__(
+            self,
+            catalog_version: Callable[[], Awaitable[Hashable]],
+            *,
+            max_size: int = 1000,
+            ttl: float = 3600,
+            version_check_interval: float = 30
+    ):
+        self._catalog_version = catalog_version
+        self._version_check_interval = version_check_interval
+        self._entries = LruCache[
+            tuple[RecommendationQuery, int, int | None, Hashable],
+            list[Document]
+        ](
+            max_size=max_size,
+            ttl=ttl
+        )
+        self._version: Hashable | None = None
+        self._version_checked_at = 0.0
+
+    async def get(
+            self,
+            query: RecommendationQuery,
+            offset: int = 0,
+            page_size: int | None = None
+    ) -> list[Document] | None:
+        return self._entries.get((query, offset, page_size, await self._current_version()))
+
+    async def put(
+            self,
+            query: RecommendationQuery,
+            documents: list[Document],
+            offset: int = 0,
+            page_size: int | None = None
+    ):
+        self._entries.put((query, offset, page_size, await self._current_version()), [
+            Document(d.page_content, metadata={"ref_id": d.metadata.get("ref_id")})
+            for d in documents
+        ])
+
+    def stats(self) -> dict:
+        return {**self._entries.stats(), "catalog_version": self._version}
+
+    async def _current_version(self) -> Hashable:
+        now = time.monotonic()
+
+        if self._version is None or now - self._version_checked_at >= self._version_check_interval:
+            version = await self._catalog_version()
+            if version != self._version:
+                self._entries.clear()
+            self._version = version
+            self._version_checked_at = now
+
+        return self._version
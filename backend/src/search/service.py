@@ -1,10 +1,23 @@
+import logging
+from typing import AsyncIterator
 from langchain_core.documents import Document
+from langchain_core.messages import HumanMessage
 from langchain_core.runnables import RunnableConfig
+from backend.src.common.server_sent_event import ServerSentEvent
 from backend.src.products.service import ProductService
 from backend.src.users.service import UserService
-from backend.src.search.models import ProductRecommendation, QueryEvaluationOut, BaseUserSearch
+from backend.src.search.models import ProductRecommendation, QueryEvaluationOut, BaseUserSearch, \
+    RecommendationQuery, RecommendationPage
+from backend.src.search.evaluation_cache import QueryEvaluationCache
+from backend.src.search.recommendation_cache import RecommendationCache
+from backend.src.search.candidate_pool import CandidatePool
 from backend.src.search.graphs.search_graph import SearchGraph
+from backend.src.search.graphs.search_graph_state import SearchGraphState, QueryEvaluation
 from backend.src.search.graphs.retrieve_graph import RetrieveGraph
+from backend.src.search.graphs.retrieve_graph_state import RelevanceFilter
+from backend.src.search.query_filters import QueryFilters
+
+log = logging.getLogger(__name__)
 
 
 class SearchService:
@@ -13,32 +26,48 @@ class SearchService:
             product_service: ProductService,
             user_service: UserService,
             search_graph: SearchGraph,
-            retrieve_graph: RetrieveGraph
+            retrieve_graph: RetrieveGraph,
+            evaluation_cache: QueryEvaluationCache | None = None,
+            recommendation_cache: RecommendationCache | None = None,
+            candidate_pool: CandidatePool | None = None
     ):
         self._product_service = product_service
         self._user_service = user_service
         self._search_graph = search_graph
         self._retrieve_graph = retrieve_graph
+        self._evaluation_cache = evaluation_cache
+        self._recommendation_cache = recommendation_cache
+        self._candidate_pool = candidate_pool
 
-    def evaluate_user_query(
+    async def evaluate_user_query(
             self,
             user_search: BaseUserSearch,
             user_id: int,
             thread_id: int | None
     ) -> QueryEvaluationOut:
-        new_thread_id = self._user_service.create_thread(user_id).id if not thread_id else None
+        new_thread = await self._user_service.create_thread(user_id) if not thread_id else None
+        new_thread_id = new_thread.id if new_thread else None
         config = self.__get_graph_config(thread_id if thread_id else new_thread_id)
 
         try:
-            return self._evaluate_user_query(user_search, config)
+            return await self._evaluate_user_query(user_search, config)
         except Exception:
             if new_thread_id:
-                self._user_service.delete_thread(new_thread_id)
+                await self._user_service.delete_thread(new_thread_id)
             raise
 
-    def get_query_evaluation(self, thread_id: int) -> QueryEvaluationOut | None:
+    async def stream_user_query_evaluation(
+            self,
+            user_search: BaseUserSearch,
+            thread_id: int
+    ) -> AsyncIterator[ServerSentEvent]:
+        config = self.__get_graph_config(thread_id)
+        await self.__validate_user_search(user_search, config)
+        return self._stream_user_query_evaluation(user_search, config)
+
+    async def get_query_evaluation(self, thread_id: int) -> QueryEvaluationOut | None:
         config = self.__get_graph_config(thread_id)
-        state = self._search_graph.get_state(config)
+        state = await self._search_graph.aget_state(config)
         query_evaluation = state.query_evaluation if state else None
 
         return QueryEvaluationOut(
@@ -51,70 +80,303 @@ class SearchService:
             follow_up_questions=[]
         )
 
-    def get_recommendations(
+    async def get_recommendations(
             self,
             thread_id: int,
             *,
-            rerank: bool = False
-    ) -> list[ProductRecommendation] | None:
-        config = self.__get_graph_config(thread_id)
-        state = self._search_graph.get_state(config)
-        query_evaluation = state.query_evaluation if state else None
-        query = query_evaluation.cleaned_query if query_evaluation else None
+            rerank: bool = False,
+            relevance_filter: RelevanceFilter = RelevanceFilter.LLM,
+            cursor: str | None = None
+    ) -> RecommendationPage:
+        query = await self.__get_recommendation_query(thread_id, rerank, relevance_filter)
 
-        if not query:
-            raise ValueError("User search needs refinement")
+        if not self._candidate_pool:
+            if cursor:
+                raise ValueError("Paginating recommendations is not enabled")
+
+            documents = await self._get_relevant_documents(query)
+            return RecommendationPage(
+                recommendations=await self._map_documents_to_products(documents)
+            )
 
-        if documents := self._retrieve_graph.invoke(
-                query=query,
-                rerank_documents=rerank
-        ).relevant_documents:
-            return self._map_documents_to_products(documents)
+        offset = self._candidate_pool.decode_cursor(query, cursor) if cursor else 0
+        candidates, next_offset = await self._candidate_pool.get_page(thread_id, query, offset)
+        documents = await self._get_relevant_documents(
+            query,
+            candidates,
+            offset,
+            self._candidate_pool.page_size
+        )
+
+        return RecommendationPage(
+            recommendations=await self._map_documents_to_products(documents),
+            next_cursor=self._candidate_pool.encode_cursor(
+                query,
+                next_offset
+            ) if next_offset is not None else None
+        )
 
-        return []
+    async def stream_recommendations(
+            self,
+            thread_id: int,
+            *,
+            rerank: bool = False,
+            relevance_filter: RelevanceFilter = RelevanceFilter.LLM
+    ) -> AsyncIterator[ServerSentEvent]:
+        query = await self.__get_recommendation_query(thread_id, rerank, relevance_filter)
+        return self._stream_recommendations(query)
 
-    def _evaluate_user_query(
+    async def _evaluate_user_query(
             self,
             user_search: BaseUserSearch,
             config: RunnableConfig
     ) -> QueryEvaluationOut:
-        if not user_search.has_content():
-            raise ValueError("No query and no answers given, indicate at least one of the two")
-
-        if not self.__user_answers_valid(user_search, config):
-            raise ValueError("Answer IDs missmatch question IDs")
+        await self.__validate_user_search(user_search, config)
 
         if user_query := user_search.query:
-            query_evaluation = self._search_graph.invoke(user_query, config).query_evaluation
+            query_evaluation = await self._evaluate_query(user_query, config)
 
         if formatted_answers := user_search.format_answers():
-            query_evaluation = self._search_graph.invoke(formatted_answers, config).query_evaluation
+            query_evaluation = (
+                await self._search_graph.ainvoke(formatted_answers, config)
+            ).query_evaluation
 
         thread_id = config.get("configurable").get("thread_id")
-        self._user_service.update_thread(thread_id)
+        await self._user_service.update_thread(thread_id)
         return QueryEvaluationOut(**query_evaluation.model_dump(), thread_id=thread_id)
 
-    def _map_documents_to_products(self, documents: list[Document]) -> list[ProductRecommendation]:
+    async def _stream_user_query_evaluation(
+            self,
+            user_search: BaseUserSearch,
+            config: RunnableConfig
+    ) -> AsyncIterator[ServerSentEvent]:
+        thread_id = config.get("configurable").get("thread_id")
+        query_evaluation = None
+        messages = [(user_search.query, True), (user_search.format_answers(), False)]
+
+        yield ServerSentEvent(event="evaluation_started", data={"thread_id": thread_id})
+
+        try:
+            for message, cacheable in messages:
+                if not message:
+                    continue
+
+                if cacheable and (cached := await self.__get_cached_evaluation(message, config)):
+                    query_evaluation = cached
+                    for question in cached.follow_up_questions:
+                        yield ServerSentEvent(event="follow_up_question", data=question)
+                    continue
+
+                async for mode, chunk in self._search_graph.astream(message, config):
+                    if mode != "updates":
+                        continue
+
+                    if evaluation := (chunk.get("tools") or {}).get("query_evaluation"):
+                        query_evaluation = evaluation
+                        for question in evaluation.follow_up_questions:
+                            yield ServerSentEvent(event="follow_up_question", data=question)
+
+                if cacheable:
+                    state = await self._search_graph.aget_state(config)
+                    await self.__cache_evaluation(message, state)
+        except Exception as e:
+            log.error("Query evaluation of thread %s failed: %s", thread_id, str(e))
+            yield ServerSentEvent(event="error", data={"detail": "Query evaluation failed"})
+            return
+
+        if query_evaluation is None:
+            log.error("Query evaluation of thread %s produced no result", thread_id)
+            yield ServerSentEvent(event="error", data={"detail": "Query evaluation failed"})
+            return
+
+        await self._user_service.update_thread(thread_id)
+        yield ServerSentEvent(
+            event="evaluation",
+            data=QueryEvaluationOut(**query_evaluation.model_dump(), thread_id=thread_id)
+        )
+
+    async def _evaluate_query(self, query: str, config: RunnableConfig) -> QueryEvaluation:
+        if cached := await self.__get_cached_evaluation(query, config):
+            return cached
+
+        state = await self._search_graph.ainvoke(query, config)
+        await self.__cache_evaluation(query, state)
+        return state.query_evaluation
+
+    async def _get_relevant_documents(
+            self,
+            query: RecommendationQuery,
+            candidates: list[Document] | None = None,
+            offset: int = 0,
+            page_size: int | None = None
+    ) -> list[Document]:
+        cached = await self.__get_cached_recommendations(query, offset, page_size)
+
+        if cached is not None:
+            return cached
+
+        if candidates is not None and not candidates:
+            return []
+
+        documents = (await self._retrieve_graph.ainvoke(
+            **query.to_graph_input(),
+            retrieved_documents=candidates or []
+        )).relevant_documents
+        await self.__cache_recommendations(query, documents, offset, page_size)
+        return documents
+
+    async def _stream_recommendations(
+            self,
+            query: RecommendationQuery
+    ) -> AsyncIterator[ServerSentEvent]:
+        if (cached := await self.__get_cached_recommendations(query)) is not None:
+            yield ServerSentEvent(
+                event="candidates",
+                data=[d.metadata.get("ref_id") for d in cached]
+            )
+            for recommendation in await self._map_documents_to_products(cached):
+                yield ServerSentEvent(event="recommendation", data=recommendation)
+            yield ServerSentEvent(event="done")
+            return
+
+        relevant_documents = []
+
+        async for mode, chunk in self._retrieve_graph.astream(**query.to_graph_input()):
+            if mode == "updates":
+                for update in chunk.values():
+                    if documents := (update or {}).get("retrieved_documents"):
+                        yield ServerSentEvent(
+                            event="candidates",
+                            data=[d.metadata.get("ref_id") for d in documents]
+                        )
+                    if "relevant_documents" in (update or {}):
+                        relevant_documents = update["relevant_documents"]
+            elif documents := chunk.get("relevant_documents"):
+                for recommendation in await self._map_documents_to_products(documents):
+                    yield ServerSentEvent(event="recommendation", data=recommendation)
+
+        await self.__cache_recommendations(query, relevant_documents)
+        yield ServerSentEvent(event="done")
+
+    async def _map_documents_to_products(
+            self,
+            documents: list[Document]
+    ) -> list[ProductRecommendation]:
+        if not documents:
+            return []
+
         ref_ids = [doc.metadata.get("ref_id") for doc in documents]
-        products = self._product_service.find_by_ids(ref_ids)
+        products = await self._product_service.find_by_ids_ordered(ref_ids)
         recommendations = []
 
+        if stale_ref_ids := [ref_id for ref_id in ref_ids if ref_id not in products]:
+            log.warning("Skipping documents referencing missing products %s", stale_ref_ids)
+
         for document in documents:
-            ref_id = document.metadata.get("ref_id")
-            product = next(filter(lambda p: p.id == ref_id, products))
-            recommendations.append(ProductRecommendation(
-                **product.model_dump(),
-                shop={**product.shop.model_dump()},
-                description=document.page_content
-            ))
+            if product := products.pop(document.metadata.get("ref_id"), None):
+                recommendations.append(ProductRecommendation.model_construct(
+                    id=product.id,
+                    price=product.price,
+                    title=product.title,
+                    url=product.url,
+                    thumbnail_url=product.thumbnail_url,
+                    shop=product.shop,
+                    description=document.page_content
+                ))
 
         return recommendations
 
-    def __user_answers_valid(self, user_search: BaseUserSearch, config: RunnableConfig) -> bool:
+    async def __get_cached_evaluation(
+            self,
+            query: str,
+            config: RunnableConfig
+    ) -> QueryEvaluation | None:
+        if not self._evaluation_cache:
+            return None
+
+        if (await self._search_graph.aget_dict_state(config)).get("messages"):
+            return None
+
+        if cached := await self._evaluation_cache.get(query):
+            await self._search_graph.aupdate_state(
+                config=config,
+                as_node="tools",
+                messages=[HumanMessage(query), *cached.messages],
+                query_evaluation=cached.query_evaluation
+            )
+            return cached.query_evaluation
+
+        return None
+
+    async def __cache_evaluation(self, query: str, state: SearchGraphState | None):
+        if not self._evaluation_cache or not state or not state.query_evaluation:
+            return
+
+        human_messages = [m for m in state.messages if isinstance(m, HumanMessage)]
+        if len(human_messages) != 1:
+            return
+
+        response_messages = state.messages[state.messages.index(human_messages[0]) + 1:]
+        await self._evaluation_cache.put(query, state.query_evaluation, response_messages)
+
+    async def __get_cached_recommendations(
+            self,
+            query: RecommendationQuery,
+            offset: int = 0,
+            page_size: int | None = None
+    ) -> list[Document] | None:
+        if not self._recommendation_cache:
+            return None
+
+        return await self._recommendation_cache.get(query, offset, page_size)
+
+    async def __cache_recommendations(
+            self,
+            query: RecommendationQuery,
+            documents: list[Document],
+            offset: int = 0,
+            page_size: int | None = None
+    ):
+        if self._recommendation_cache:
+            await self._recommendation_cache.put(query, documents, offset, page_size)
+
+    async def __get_recommendation_query(
+            self,
+            thread_id: int,
+            rerank: bool,
+            relevance_filter: RelevanceFilter
+    ) -> RecommendationQuery:
+        config = self.__get_graph_config(thread_id)
+        state = await self._search_graph.aget_state(config)
+        query_evaluation = state.query_evaluation if state else None
+        query = query_evaluation.cleaned_query if query_evaluation else None
+
+        if not query:
+            raise ValueError("User search needs refinement")
+
+        return RecommendationQuery(
+            query=query,
+            filters=QueryFilters.from_query_evaluation(query_evaluation),
+            rerank=rerank,
+            relevance_filter=relevance_filter
+        )
+
+    async def __validate_user_search(self, user_search: BaseUserSearch, config: RunnableConfig):
+        if not user_search.has_content():
+            raise ValueError("No query and no answers given, indicate at least one of the two")
+
+        if not await self.__user_answers_valid(user_search, config):
+            raise ValueError("Answer IDs missmatch question IDs")
+
+    async def __user_answers_valid(
+            self,
+            user_search: BaseUserSearch,
+            config: RunnableConfig
+    ) -> bool:
         if not user_search.get_answers():
             return True
 
-        state = self._search_graph.get_state(config)
+        state = await self._search_graph.aget_state(config)
         query_evaluation = state.query_evaluation if state else None
         follow_up_questions = query_evaluation.follow_up_questions if query_evaluation else []
         answered_questions = query_evaluation.answered_questions if query_evaluation else []
@@ -13,4 +13,5 @@ class ShopOut(ShopBase):
 
 class Shop(ShopBase, table=True):
     id: int | None = Field(default=None, primary_key=True)
+    name: str = Field(unique=True, index=True)
     products: list[Product] = Relationship(back_populates="shop")
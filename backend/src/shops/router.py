@@ -6,18 +6,18 @@ router = APIRouter(prefix="/shops", tags=["shops"])
 
 
 @router.get("/", response_model=list[ShopOut])
-def get_shops(service: ShopServiceDep):
-    return service.find_all()
+async def get_shops(service: ShopServiceDep):
+    return await service.find_all()
 
 
 @router.post("/", response_model=ShopOut, status_code=201)
-def create_shop(shop_in: ShopIn, service: ShopServiceDep):
-    return service.create(shop_in)
+async def create_shop(shop_in: ShopIn, service: ShopServiceDep):
+    return await service.create(shop_in)
 
 
 @router.get("/{id}", response_model=ShopOut)
-def get_shop_by_id(id: int, service: ShopServiceDep):
-    shop = service.find_by_id(id)
+async def get_shop_by_id(id: int, service: ShopServiceDep):
+    shop = await service.find_by_id(id, with_products=True)
     if not shop:
         raise HTTPException(status_code=404)
     return shop
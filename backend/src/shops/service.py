@@ -1,61 +1,122 @@
-from sqlmodel import Session, select, delete
+from sqlmodel import select, delete
+from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel.sql.expression import Select, SelectOfScalar
+from sqlalchemy.orm import selectinload
+from sqlalchemy.dialects.postgresql import insert
 from backend.src.shops.models import Shop, ShopIn
 
 
 class ShopService:
-    def __init__(self, session: Session):
+    def __init__(self, session: AsyncSession):
         self._session = session
 
-    def find_all(self) -> list[Shop]:
-        return self._query(select(Shop)).all()
+    async def find_all(self) -> list[Shop]:
+        return (await self._query(select(Shop).options(selectinload(Shop.products)))).all()
 
-    def find_by_id(self, id: int) -> Shop | None:
-        return self._session.get(Shop, id)
+    async def find_by_id(self, id: int, *, with_products: bool = False) -> Shop | None:
+        options = [selectinload(Shop.products)] if with_products else []
+        return await self._session.get(Shop, id, options=options)
 
-    def find_by_name(self, name: str) -> Shop | None:
-        return self._query(select(Shop).where(Shop.name == name)).first()
+    async def find_by_name(self, name: str) -> Shop | None:
+        return (await self._query(select(Shop).where(Shop.name == name))).first()
 
-    def create(self, shop_in: ShopIn) -> Shop:
+    async def find_existing_ids(self, ids: set[int]) -> set[int]:
+        if not ids:
+            return set()
+
+        return set((await self._query(select(Shop.id).where(Shop.id.in_(ids)))).all())
+
+    async def find_ids_by_names(self, names: set[str]) -> dict[str, int]:
+        if not names:
+            return {}
+
+        rows = await self._query(select(Shop.name, Shop.id).where(Shop.name.in_(names)))
+        return {name: id for name, id in rows.all()}
+
+    async def create(self, shop_in: ShopIn) -> Shop:
         shop = Shop.model_validate(shop_in)
         self._session.add(shop)
-        self._session.commit()
-        self._session.refresh(shop)
+        await self._session.commit()
+        await self._session.refresh(shop, ["products"])
         return shop
 
     def create_batch(self, shops_in: list[ShopIn] = ()) -> "ShopService.BatchedCreate":
         return ShopService.BatchedCreate(self, shops_in)
 
-    def delete(self, shops: list[Shop]):
+    def create_resolver(self) -> "ShopService.Resolver":
+        return ShopService.Resolver(self)
+
+    async def delete(self, shops: list[Shop]):
         ids = [shop.id for shop in shops]
-        self._query(delete(Shop).where(Shop.id.in_(ids)))
-        self._session.commit()
+        await self._query(delete(Shop).where(Shop.id.in_(ids)))
+        await self._session.commit()
 
-    def _query(self, query: Select | SelectOfScalar):
-        return self._session.exec(query)
+    async def _query(self, query: Select | SelectOfScalar):
+        return await self._session.exec(query)
 
     class BatchedCreate:
         def __init__(self, shop_service: "ShopService", shops_in: list[ShopIn] = ()):
             self._shop_service = shop_service
             self._shops_in = list(shops_in)
+            self._names = {shop_in.name for shop_in in self._shops_in}
 
         def add(self, shop_in: ShopIn) -> "ShopService.BatchedCreate":
             self._shops_in.append(shop_in)
+            self._names.add(shop_in.name)
             return self
 
-        def commit(self) -> list[Shop]:
+        async def commit(self) -> list[Shop]:
             shops = [Shop.model_validate(shop_in) for shop_in in self._shops_in]
-            self._shop_service._session.bulk_save_objects(shops)
-            self._shop_service._session.commit()
+            await self._shop_service._session.run_sync(
+                lambda session: session.bulk_save_objects(shops)
+            )
+            await self._shop_service._session.commit()
             self._shops_in = []
+            self._names = set()
 
-            return self._shop_service._query(
-                select(Shop).order_by(Shop.id.desc()).limit(len(shops))).all()
+            return (await self._shop_service._query(
+                select(Shop).order_by(Shop.id.desc()).limit(len(shops)))).all()
 
         def __contains__(self, item):
             if isinstance(item, ShopIn):
-                return item.name in [shop_in.name for shop_in in self._shops_in]
+                return item.name in self._names
             elif isinstance(item, str):
-                return item in [shop_in.name for shop_in in self._shops_in]
+                return item in self._names
             else:
                 raise ValueError(f"Type {type(item)} not supported")
+
+    class Resolver:
+        def __init__(self, shop_service: "ShopService"):
+            self._shop_service = shop_service
+            self._ids: dict[str, int] = {}
+
+        async def resolve(self, shops_in: list[ShopIn]) -> dict[str, int]:
+            missing = {
+                shop_in.name: shop_in
+                for shop_in in shops_in if shop_in.name not in self._ids
+            }
+
+            if missing:
+                self._ids |= await self._shop_service.find_ids_by_names(set(missing))
+
+            if new_shops := [shop_in for name, shop_in in missing.items() if name not in self._ids]:
+                self._ids |= await self._insert(new_shops)
+
+            if unresolved := {name for name in missing if name not in self._ids}:
+                self._ids |= await self._shop_service.find_ids_by_names(unresolved)
+
+            return {
+                shop_in.name: self._ids[shop_in.name]
+                for shop_in in shops_in if shop_in.name in self._ids
+            }
+
+        async def _insert(self, shops_in: list[ShopIn]) -> dict[str, int]:
+            rows = await self._shop_service._query(
+                insert(Shop)
+                .values([shop_in.model_dump() for shop_in in shops_in])
+                .on_conflict_do_nothing(index_elements=[Shop.name])
+                .returning(Shop.name, Shop.id)
+            )
+            ids = {name: id for name, id in rows.all()}
+            await self._shop_service._session.commit()
+            return ids
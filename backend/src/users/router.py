@@ -9,18 +9,18 @@ router = APIRouter(prefix="/users", tags=["users"])
 
 
 @router.get("/", response_model=list[UserOut])
-def get_users(user_service: UserServiceDep):
-    return user_service.find_all_users()
+async def get_users(user_service: UserServiceDep):
+    return await user_service.find_all_users()
 
 
 @router.post("/", response_model=UserOut, status_code=201)
-def create_user(user_in: UserIn, user_service: UserServiceDep):
-    return user_service.create_user(user_in)
+async def create_user(user_in: UserIn, user_service: UserServiceDep):
+    return await user_service.create_user(user_in)
 
 
 @router.get("/me", response_model=UserOut)
-def get_user(user: CurrentUserDep, user_service: UserServiceDep):
-    if user := user_service.find_user_by_id(user.id):
+async def get_user(user: CurrentUserDep, user_service: UserServiceDep):
+    if user := await user_service.find_user_by_id(user.id):
         return user
 
     raise HTTPException(status_code=404)
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Response
 from backend.src.app.dependencies import UserServiceDep, SearchServiceDep
 from backend.src.authentication.router import CurrentUserDep
+from backend.src.common.server_sent_event import EventSourceResponse
 from backend.src.search.service import ProductRecommendation
 from backend.src.search.models import QueryEvaluationOut, UserSearch, BaseUserSearch, NewUserSearch
+from backend.src.search.graphs.retrieve_graph_state import RelevanceFilter
 from backend.src.users.models import ThreadOut
 
 router = APIRouter(
@@ -16,8 +18,8 @@ router = APIRouter(
 )
 
 
-def user_has_thread_access(tid: int, user: CurrentUserDep, user_service: UserServiceDep):
-    if not user_service.has_user_access_to_thread(user.id, tid):
+async def user_has_thread_access(tid: int, user: CurrentUserDep, user_service: UserServiceDep):
+    if not await user_service.has_user_access_to_thread(user.id, tid):
         raise HTTPException(status_code=403)
 
 
@@ -25,20 +27,20 @@ UserHasThreadAccess = Depends(user_has_thread_access)
 
 
 @router.get("/", response_model=list[ThreadOut])
-def get_user_threads(user: CurrentUserDep, user_service: UserServiceDep):
-    threads = user_service.find_user_threads(user.id)
+async def get_user_threads(user: CurrentUserDep, user_service: UserServiceDep):
+    threads = await user_service.find_user_threads(user.id)
     return map(lambda thread: ThreadOut(**thread.model_dump(), thread_id=thread.id), threads)
 
 
 @router.post("/", response_model=QueryEvaluationOut)
-def create_thread(
+async def create_thread(
         user: CurrentUserDep,
         search_service: SearchServiceDep,
         user_service: UserServiceDep,
         user_search: NewUserSearch | None = None
 ):
     if not user_search:
-        thread = user_service.create_thread(user.id)
+        thread = await user_service.create_thread(user.id)
 
         return QueryEvaluationOut(
             thread_id=thread.id,
@@ -47,27 +49,36 @@ def create_thread(
             follow_up_questions=[]
         )
 
-    return handle_thread_posts(user.id, None, user_search, search_service)
+    return await handle_thread_posts(user.id, None, user_search, search_service)
 
 
 @router.get("/{tid}", dependencies=[UserHasThreadAccess], response_model=QueryEvaluationOut)
-def get_user_thread(tid: int, search_service: SearchServiceDep):
-    return search_service.get_query_evaluation(tid)
+async def get_user_thread(tid: int, search_service: SearchServiceDep):
+    return await search_service.get_query_evaluation(tid)
 
 
 @router.post("/{tid}", dependencies=[UserHasThreadAccess], response_model=QueryEvaluationOut)
-def post_to_thread(
+async def post_to_thread(
         tid: int,
         user: CurrentUserDep,
         user_search: UserSearch,
         search_service: SearchServiceDep
 ):
-    return handle_thread_posts(user.id, tid, user_search, search_service)
+    return await handle_thread_posts(user.id, tid, user_search, search_service)
+
+
+@router.post("/{tid}/stream", dependencies=[UserHasThreadAccess])
+async def stream_post_to_thread(
+        tid: int,
+        user_search: UserSearch,
+        search_service: SearchServiceDep
+) -> EventSourceResponse:
+    return EventSourceResponse(await search_service.stream_user_query_evaluation(user_search, tid))
 
 
 @router.delete("/{tid}", dependencies=[UserHasThreadAccess])
-def delete_thread(tid: int, user_service: UserServiceDep):
-    user_service.delete_thread(tid)
+async def delete_thread(tid: int, user_service: UserServiceDep):
+    await user_service.delete_thread(tid)
 
 
 @router.get(
@@ -75,18 +86,45 @@ def delete_thread(tid: int, user_service: UserServiceDep):
     dependencies=[UserHasThreadAccess],
     response_model=list[ProductRecommendation]
 )
-def get_recommendations_from_thread(
+async def get_recommendations_from_thread(
         tid: int,
+        response: Response,
         search_service: SearchServiceDep,
-        rerank: bool = False
+        rerank: bool = False,
+        relevance_filter: RelevanceFilter = RelevanceFilter.LLM,
+        cursor: str | None = None
 ):
-    return search_service.get_recommendations(tid, rerank=rerank)
+    page = await search_service.get_recommendations(
+        tid,
+        rerank=rerank,
+        relevance_filter=relevance_filter,
+        cursor=cursor
+    )
+
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+
+    return page.recommendations
+
+
+@router.get("/{tid}/recommendations/stream", dependencies=[UserHasThreadAccess])
+async def stream_recommendations_from_thread(
+        tid: int,
+        search_service: SearchServiceDep,
+        rerank: bool = False,
+        relevance_filter: RelevanceFilter = RelevanceFilter.LLM
+) -> EventSourceResponse:
+    return EventSourceResponse(await search_service.stream_recommendations(
+        tid,
+        rerank=rerank,
+        relevance_filter=relevance_filter
+    ))
 
 
-def handle_thread_posts(
+async def handle_thread_posts(
         uid: int,
         tid: int | None,
         user_search: BaseUserSearch,
         search_service: SearchServiceDep
 ) -> QueryEvaluationOut:
-    return search_service.evaluate_user_query(user_search, uid, tid)
+    return await search_service.evaluate_user_query(user_search, uid, tid)
@@ -0,0 +1,54 @@
+import json
+import subprocess
+import sys
+from backend.src.data_import.extract import extract_amazon_data, shard_byte_ranges
+
+
+def write_catalog(path, n_products: int):
+    with open(path, "w", encoding="utf-8") as file:
+        for i in range(n_products):
+            file.write(json.dumps({
+                "title": f"Product {i}",
+                "parent_asin": f"B{i:09d}",
+                "price": i + 0.99,
+                "description": [f"Description of product {i}"]
+            }) + "\n")
+
+
+def test_parallel_extraction_keeps_sequential_order(tmp_path):
+    data_file = tmp_path / "catalog.jsonl"
+    write_catalog(data_file, 500)
+
+    sequential = [p.parent_asin for p in extract_amazon_data(str(data_file))]
+    parallel = [p.parent_asin for p in extract_amazon_data(str(data_file), workers=2)]
+
+    assert len(sequential) == 500
+    assert parallel == sequential
+
+
+def test_shards_cover_every_line_once(tmp_path):
+    data_file = tmp_path / "catalog.jsonl"
+    write_catalog(data_file, 50)
+
+    ranges = shard_byte_ranges(str(data_file), shard_size=100)
+
+    assert ranges[0][0] == 0
+    assert ranges[-1][1] == data_file.stat().st_size
+    assert all(end == next_start for (_, end), (next_start, _) in zip(ranges, ranges[1:]))
+
+
+def test_import_entry_point_does_not_load_app_dependencies():
+    # Spawned extraction workers re-import the import_data entry point
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, backend.src.data_import.import_data; "
+            "print('backend.src.app.dependencies' in sys.modules)"
+        ],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+    assert result.stdout.strip().splitlines()[-1] == "False"
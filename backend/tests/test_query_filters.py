@@ -0,0 +1,27 @@
+import pytest
+from backend.src.search.query_filters import QueryFilters, parse_price_bounds
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("$1,000 laptop under $1,200", (None, 1200.0)),
+    ("tv over $1,500.50", (1500.5, None)),
+    ("between $1,000 and $2,500", (1000.0, 2500.0)),
+    ("$1,000 - $12,000 camera", (1000.0, 12000.0)),
+    ("under 1,000,000 dollars", (None, 1000000.0)),
+    ("headphones under $50", (None, 50.0)),
+    ("shoes below 80 bucks", (None, 80.0)),
+    ("between $20 and $40.99", (20.0, 40.99)),
+    ("phone case for iphone 15", (None, None)),
+])
+def test_parse_price_bounds(text, expected):
+    assert parse_price_bounds(text) == expected
+
+
+def test_relaxations_drop_shop_before_price():
+    filters = QueryFilters(max_price=1200.0, shop="acme")
+
+    assert filters.relaxations() == [
+        {"$and": [{"price": {"$lte": 1200.0}}, {"shop": {"$eq": "acme"}}]},
+        {"price": {"$lte": 1200.0}},
+        None
+    ]